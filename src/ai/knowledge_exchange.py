@@ -1,11 +1,11 @@
 from src.blockchain.solana_client import SolanaClient
-from src.ai.validation import KnowledgeValidator
+from src.blockchain.keys import pk
+from src.ai.validation import KnowledgeValidator, knowledge_digest
 from src.ai.learning_pathway import LearningPathway
 import asyncio
-import json
-import hashlib
 import logging
-from typing import Dict, List
+from cachetools import TTLCache
+from typing import Dict, List, Optional, Set, Tuple
 
 
 class KnowledgeExchange:
@@ -15,6 +15,8 @@ class KnowledgeExchange:
         self.learning_pathways: Dict[str, LearningPathway] = {}
         self.logger = logging.getLogger(__name__)
         self._exchange_task = None
+        # Confirmed transactions stay confirmed, so positive checks are cached
+        self._verified_signatures = TTLCache(maxsize=100_000, ttl=600)
 
     async def start_exchange_cycle(self):
         self._exchange_task = asyncio.create_task(self._run_exchange_cycle())
@@ -27,37 +29,65 @@ class KnowledgeExchange:
             self.logger.info("Knowledge exchange cycle stopped")
 
     async def submit_knowledge(self, knowledge_data: dict) -> str:
+        transaction_ids = await self.submit_knowledge_batch([knowledge_data])
+        return transaction_ids[0]
+
+    async def submit_knowledge_batch(self, knowledge_batch: List[dict]) -> List[Optional[str]]:
         try:
-            # Validate knowledge structure and content
-            if not await self.validator.validate_knowledge(knowledge_data):
-                raise ValueError("Knowledge validation failed")
+            submissions = []
+            for knowledge_data in knowledge_batch:
+                # Hash the canonical payload once and reuse the digest as the
+                # validation cache key, knowledge identifier and signature
+                digest = self._compute_digest(knowledge_data)
 
-            # Generate unique identifier for knowledge
-            knowledge_id = self._generate_knowledge_id(knowledge_data)
+                # Validate knowledge structure and content
+                if not await self.validator.validate_knowledge(knowledge_data, cache_key=digest):
+                    raise ValueError("Knowledge validation failed")
 
-            # Create signature for blockchain transaction
-            signature = self._create_signature(knowledge_data)
+                submissions.append((digest.hex(), digest, knowledge_data))
 
             # Submit to blockchain
-            transaction_id = await self.solana_client.submit_knowledge_transaction(
-                knowledge_data,
-                signature
-            )
-
-            # Create learning pathway if new domain
-            domain = knowledge_data.get('domain')
-            if domain not in self.learning_pathways:
-                self.learning_pathways[domain] = LearningPathway(domain)
-
-            # Add knowledge to pathway
-            await self.learning_pathways[domain].add_knowledge(
-                knowledge_id,
-                knowledge_data
-            )
-
-            return transaction_id
+            semaphore = asyncio.Semaphore(16)  # Cap concurrent RPC load
+
+            async def submit(knowledge_data: dict, signature: bytes) -> str:
+                async with semaphore:
+                    return await self.solana_client.submit_knowledge_transaction(
+                        knowledge_data,
+                        signature
+                    )
+
+            results = await asyncio.gather(*(
+                submit(knowledge_data, signature)
+                for _, signature, knowledge_data in submissions
+            ), return_exceptions=True)
+
+            # Items already written on chain are ingested even when others in
+            # the batch fail; failed items come back as None
+            failures = [result for result in results if isinstance(result, BaseException)]
+            if failures and len(failures) == len(results):
+                raise failures[0]
+            for failure in failures:
+                self.logger.error("Failed to submit knowledge transaction: %s", failure)
+
+            # Group by domain so each pathway ingests its share in one pass
+            batches: Dict[str, List[Tuple[str, dict]]] = {}
+            for (knowledge_id, _, knowledge_data), result in zip(submissions, results):
+                if isinstance(result, BaseException):
+                    continue
+                domain = knowledge_data.get('domain')
+                batches.setdefault(domain, []).append((knowledge_id, knowledge_data))
+
+            for domain, batch in batches.items():
+                # Create learning pathway if new domain
+                if domain not in self.learning_pathways:
+                    self.learning_pathways[domain] = LearningPathway(domain)
+
+                # Add knowledge to pathway
+                await self.learning_pathways[domain].add_knowledge_batch(batch)
+
+            return [None if isinstance(result, BaseException) else result for result in results]
         except Exception as e:
-            self.logger.error(f"Failed to submit knowledge: {str(e)}")
+            self.logger.error("Failed to submit knowledge: %s", e)
             raise
 
     async def query_knowledge(self, domain: str, query_params: dict) -> List[dict]:
@@ -68,15 +98,17 @@ class KnowledgeExchange:
             pathway = self.learning_pathways[domain]
             results = await pathway.query_knowledge(query_params)
 
-            # Verify results on blockchain
-            verified_results = []
-            for result in results:
-                if await self._verify_knowledge(result):
-                    verified_results.append(result)
+            # Verify results on blockchain, checking every signature not
+            # already known to be confirmed in one batched status lookup
+            signatures = [result.get('signature') for result in results]
+            verified = await self._verify_signatures(signatures)
 
-            return verified_results
+            return [
+                result for result, signature in zip(results, signatures)
+                if signature in verified
+            ]
         except Exception as e:
-            self.logger.error(f"Failed to query knowledge: {str(e)}")
+            self.logger.error("Failed to query knowledge: %s", e)
             raise
 
     async def _run_exchange_cycle(self):
@@ -90,35 +122,69 @@ class KnowledgeExchange:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                self.logger.error(f"Error in exchange cycle: {str(e)}")
+                self.logger.error("Error in exchange cycle: %s", e)
                 await asyncio.sleep(60)  # Retry after 1 minute
 
-    async def _verify_knowledge(self, knowledge_data: dict) -> bool:
-        try:
-            signature = knowledge_data.get('signature')
-            if not signature:
-                return False
+    async def _verify_signatures(self, signatures: List[str]) -> Set[str]:
+        verified = {
+            signature for signature in signatures
+            if signature and signature in self._verified_signatures
+        }
+        unknown = [
+            signature for signature in dict.fromkeys(signatures)
+            if signature and signature not in verified
+        ]
 
-            return await self.solana_client.verify_transaction(signature)
-        except Exception:
-            return False
+        if unknown:
+            flags = await self.solana_client.verify_transactions(unknown)
+            for signature, confirmed in zip(unknown, flags):
+                if confirmed:
+                    self._verified_signatures[signature] = True
+                    verified.add(signature)
 
-    def _generate_knowledge_id(self, knowledge_data: dict) -> str:
-        content = json.dumps(knowledge_data, sort_keys=True)
-        return hashlib.sha256(content.encode()).hexdigest()
+        return verified
 
-    def _create_signature(self, knowledge_data: dict) -> bytes:
-        content = json.dumps(knowledge_data, sort_keys=True)
-        return hashlib.sha256(content.encode()).digest()
+    def _compute_digest(self, knowledge_data: dict) -> bytes:
+        return knowledge_digest(knowledge_data)
 
     async def _distribute_rewards(self, pathway: LearningPathway):
+        # No token manager means no mint or reward authority is configured
+        token_manager = self.solana_client.token_manager
+        if token_manager is None:
+            return
+
         contributors = await pathway.get_top_contributors()
+
+        # Contributors are free-form strings from submissions; one that is not
+        # a valid address only loses its own reward
+        rewards = []
         for contributor, score in contributors:
             try:
-                reward_amount = int(score * 1e9)  # Convert to lamports
-                await self.solana_client.token_manager.distribute_rewards(
-                    contributor,
-                    reward_amount
+                rewards.append((pk(contributor), int(score * token_manager.amount_scale)))  # Convert to base units
+            except (TypeError, ValueError) as e:
+                self.logger.error("Skipping reward for contributor %r: %s", contributor, e)
+
+        if not rewards:
+            return
+
+        try:
+            # Pay everyone in packed batch transactions, then confirm all of
+            # them with one status poll
+            signatures = await token_manager.distribute_rewards_batch(rewards)
+
+            unsent = signatures.count(None)
+            if unsent:
+                self.logger.error("%d of %d rewards were not sent", unsent, len(signatures))
+
+            # Recipients packed into one transaction share its signature
+            sent = [signature for signature in dict.fromkeys(signatures) if signature is not None]
+            confirmed = await self.solana_client.verify_transactions(sent)
+
+            unconfirmed = confirmed.count(False)
+            if unconfirmed:
+                self.logger.error(
+                    "%d of %d reward transactions were not confirmed",
+                    unconfirmed, len(sent)
                 )
-            except Exception as e:
-                self.logger.error(f"Failed to distribute rewards: {str(e)}")
\ No newline at end of file
+        except Exception as e:
+            self.logger.error("Failed to distribute rewards: %s", e)
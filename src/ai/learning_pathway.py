@@ -1,81 +1,130 @@
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Hashable, List, Set, Tuple
+from collections import Counter
+from functools import reduce
 import asyncio
-import json
+import time
+import zlib
 import numpy as np
+from scipy import sparse
+from scipy.sparse import linalg
 from datetime import datetime
 import logging
 
+TOKEN_FEATURES = 2 ** 18  # hashed token columns in the similarity matrix
+INDEXED_FIELDS = ('domain', 'contributor', 'version')
+
 
 class LearningPathway:
     def __init__(self, domain: str):
         self.domain = domain
         self.knowledge_graph: Dict[str, dict] = {}
-        self.connections: Dict[str, List[str]] = {}
-        self.performance_metrics: Dict[str, float] = {}
         self.contributor_scores: Dict[str, float] = {}
         self.logger = logging.getLogger(__name__)
 
-    async def add_knowledge(self, knowledge_id: str, knowledge_data: dict):
-        try:
-            self.knowledge_graph[knowledge_id] = knowledge_data
+        # Per-node state is kept as arrays aligned with _ids; the arrays grow
+        # by doubling, so only the first len(_ids) entries are live
+        self._ids: List[str] = []
+        self._id_to_idx: Dict[str, int] = {}
+        self._perf = np.zeros(0, dtype=np.float32)
+        self._token_counts = np.zeros(0, dtype=np.float32)
+        self._timestamps = np.zeros(0)  # epoch seconds, NaN when unknown
+        self._usage = np.zeros(0)
+
+        # Directed edges as parallel index arrays (COO), in insertion order;
+        # like the node arrays they grow by doubling, with _edge_count live
+        self._edge_src = np.zeros(0, dtype=np.int32)
+        self._edge_dst = np.zeros(0, dtype=np.int32)
+        self._edge_count = 0
+
+        # Binary token rows aligned with _ids, used for similarity lookups
+        self._token_matrix = sparse.csr_matrix((0, TOKEN_FEATURES), dtype=np.float32)
+
+        # Inverted indexes over the filterable fields: field -> value -> ids
+        self._indexes: Dict[str, Dict[Any, Set[str]]] = {
+            field: {} for field in INDEXED_FIELDS
+        }
 
-            # Update connections
-            related_ids = self._find_related_knowledge(knowledge_data)
-            self.connections[knowledge_id] = related_ids
+    @property
+    def performance_metrics(self) -> Dict[str, float]:
+        return dict(zip(self._ids, self._perf[:len(self._ids)].tolist()))
 
-            # Update bidirectional connections
-            for related_id in related_ids:
-                if related_id in self.connections:
-                    self.connections[related_id].append(knowledge_id)
+    @property
+    def connections(self) -> Dict[str, List[str]]:
+        # Ids are only materialized here; a stable sort by source keeps each
+        # node's neighbours in the order the edges were added
+        src = self._edge_src[:self._edge_count]
+        dst = self._edge_dst[:self._edge_count]
+        order = np.argsort(src, kind='stable')
+        bounds = np.searchsorted(src[order], np.arange(len(self._ids) + 1))
+        neighbours = [self._ids[j] for j in dst[order].tolist()]
 
-            # Update contributor score
-            contributor = knowledge_data.get('contributor')
-            if contributor:
-                current_score = self.contributor_scores.get(contributor, 0)
-                self.contributor_scores[contributor] = current_score + 1
+        return {
+            knowledge_id: neighbours[bounds[i]:bounds[i + 1]]
+            for i, knowledge_id in enumerate(self._ids)
+        }
 
-            await self._calculate_performance_metrics(knowledge_id)
+    async def add_knowledge(self, knowledge_id: str, knowledge_data: dict):
+        try:
+            self._ingest([(knowledge_id, knowledge_data)])
         except Exception as e:
-            self.logger.error(f"Failed to add knowledge: {str(e)}")
+            self.logger.error("Failed to add knowledge: %s", e)
             raise
 
-    async def query_knowledge(self, query_params: dict) -> List[dict]:
+    async def add_knowledge_batch(self, batch: List[Tuple[str, dict]]):
         try:
-            matched_knowledge = []
-            for knowledge_id, knowledge_data in self.knowledge_graph.items():
-                if self._matches_query(knowledge_data, query_params):
-                    matched_knowledge.append({
-                        **knowledge_data,
-                        'performance_score': self.performance_metrics.get(knowledge_id, 0)
-                    })
+            self._ingest(batch)
+        except Exception as e:
+            self.logger.error("Failed to add knowledge batch: %s", e)
+            raise
 
-            # Sort by performance score
-            matched_knowledge.sort(
-                key=lambda x: x['performance_score'],
-                reverse=True
+    async def query_knowledge(self, query_params: dict) -> List[dict]:
+        try:
+            # Narrow down candidates with the inverted indexes, smallest first
+            indexed = sorted(
+                (
+                    self._indexes[key].get(value, set())
+                    for key, value in query_params.items()
+                    if key in self._indexes and isinstance(value, Hashable)
+                ),
+                key=len
             )
+            candidate_ids = reduce(set.intersection, indexed) if indexed else self.knowledge_graph
+
+            # Indexes only narrow the search; the full query is still checked
+            candidate_idx = np.array(sorted(
+                self._id_to_idx[knowledge_id] for knowledge_id in candidate_ids
+                if self._matches_query(self.knowledge_graph[knowledge_id], query_params)
+            ), dtype=np.intp)
 
-            return matched_knowledge
+            # Sort by performance score
+            scores = self._perf[candidate_idx]
+            order = np.argsort(-scores, kind='stable')
+
+            return [
+                {
+                    **self.knowledge_graph[self._ids[candidate_idx[i]]],
+                    'performance_score': float(scores[i])
+                }
+                for i in order
+            ]
         except Exception as e:
-            self.logger.error(f"Failed to query knowledge: {str(e)}")
+            self.logger.error("Failed to query knowledge: %s", e)
             raise
 
     async def optimize_pathways(self):
         try:
             # Calculate centrality for each knowledge node
-            centrality_scores = self._calculate_centrality()
+            centrality = self._calculate_centrality()
 
             # Update performance metrics based on centrality
-            for knowledge_id, centrality in centrality_scores.items():
-                current_performance = self.performance_metrics.get(knowledge_id, 0)
-                self.performance_metrics[knowledge_id] = (
-                        0.7 * current_performance + 0.3 * centrality
-                )
+            performance = self._perf[:len(self._ids)]
+            performance *= 0.7
+            performance += 0.3 * centrality
 
             # Prune low-performing connections
             await self._prune_connections()
         except Exception as e:
-            self.logger.error(f"Failed to optimize pathways: {str(e)}")
+            self.logger.error("Failed to optimize pathways: %s", e)
 
     async def get_top_contributors(self) -> List[Tuple[str, float]]:
         try:
@@ -83,73 +132,175 @@ class LearningPathway:
             contributors.sort(key=lambda x: x[1], reverse=True)
             return contributors[:10]  # Return top 10 contributors
         except Exception as e:
-            self.logger.error(f"Failed to get top contributors: {str(e)}")
+            self.logger.error("Failed to get top contributors: %s", e)
             return []
 
-    def _find_related_knowledge(self, knowledge_data: dict) -> List[str]:
-        related = []
-        for existing_id, existing_data in self.knowledge_graph.items():
-            if self._calculate_similarity(knowledge_data, existing_data) > 0.7:
-                related.append(existing_id)
-        return related
-
-    def _calculate_similarity(self, data1: dict, data2: dict) -> float:
-        text1 = json.dumps(data1.get('content', ''))
-        text2 = json.dumps(data2.get('content', ''))
-
-        # Simple Jaccard similarity
-        set1 = set(text1.split())
-        set2 = set(text2.split())
+    def _ingest(self, batch: List[Tuple[str, dict]]):
+        # Register new nodes; ids already in the graph only refresh their data
+        offset = len(self._ids)
+        for knowledge_id, knowledge_data in batch:
+            if knowledge_id not in self._id_to_idx:
+                self._register(knowledge_id)
+            self.knowledge_graph[knowledge_id] = knowledge_data
+            self._index_knowledge(knowledge_id, knowledge_data)
 
-        intersection = len(set1.intersection(set2))
-        union = len(set1.union(set2))
+        # Update connections from the similarity of the new nodes to every
+        # existing node and to the nodes ahead of them in the batch
+        if len(self._ids) > offset:
+            new_rows = self._token_rows(
+                [self.knowledge_graph[id_] for id_ in self._ids[offset:]]
+            )
+            self._token_counts[offset:len(self._ids)] = np.diff(new_rows.indptr)
+            self._token_matrix = sparse.vstack(
+                [self._token_matrix, new_rows],
+                format='csr'
+            )
 
-        return intersection / union if union > 0 else 0
+            # Each related pair is linked in both directions
+            pairs = self._find_related_knowledge(new_rows, offset)
+            sources, related = pairs[:, 0] + offset, pairs[:, 1]
+            self._add_edges(
+                np.column_stack([sources, related]).ravel(),
+                np.column_stack([related, sources]).ravel()
+            )
 
-    def _calculate_centrality(self) -> Dict[str, float]:
-        matrix_size = len(self.knowledge_graph)
+        # Update contributor scores
+        contributors = Counter(knowledge_data.get('contributor') for _, knowledge_data in batch)
+        for contributor, count in contributors.items():
+            if contributor:
+                current_score = self.contributor_scores.get(contributor, 0)
+                self.contributor_scores[contributor] = current_score + count
+
+        # Update performance metrics for the whole batch at once
+        indices = np.fromiter(
+            (self._id_to_idx[knowledge_id] for knowledge_id, _ in batch),
+            dtype=np.intp,
+            count=len(batch)
+        )
+        for index, (_, knowledge_data) in zip(indices, batch):
+            try:
+                self._timestamps[index], self._usage[index] = self._metric_inputs(knowledge_data)
+            except Exception as e:
+                self._timestamps[index] = np.nan
+                self.logger.error("Failed to calculate performance metrics: %s", e)
+        self._score_nodes(indices)
+
+    def _find_related_knowledge(self, new_rows: sparse.csr_matrix, offset: int) -> np.ndarray:
+        # Shared-token counts between the new rows (global index offset + i)
+        # and all rows, as one sparse product over the binary token matrix
+        shared = (new_rows @ self._token_matrix.T).tocoo()
+        rows, cols, intersection = shared.row, shared.col, shared.data
+
+        # Jaccard similarity; each node only looks at the nodes before it
+        union = self._token_counts[offset + rows] + self._token_counts[cols] - intersection
+        related = (cols < offset + rows) & (intersection > 0.7 * union)
+
+        pairs = np.column_stack([rows[related], cols[related]])
+        return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    def _token_rows(self, batch: List[dict]) -> sparse.csr_matrix:
+        # Hash each distinct token into a fixed number of columns
+        columns = [
+            np.unique(np.fromiter(
+                (zlib.crc32(token.encode()) % TOKEN_FEATURES
+                 for token in _tokenize(knowledge_data.get('content', ''))),
+                dtype=np.int32
+            ))
+            for knowledge_data in batch
+        ]
+        indptr = np.concatenate([[0], np.cumsum([len(c) for c in columns])])
+
+        return sparse.csr_matrix(
+            (np.ones(indptr[-1], dtype=np.float32), np.concatenate(columns), indptr),
+            shape=(len(batch), TOKEN_FEATURES)
+        )
+
+    def _register(self, knowledge_id: str) -> int:
+        index = len(self._ids)
+        if index == len(self._perf):
+            capacity = max(16, 2 * index)
+            self._perf = _grow(self._perf, capacity)
+            self._token_counts = _grow(self._token_counts, capacity)
+            self._timestamps = _grow(self._timestamps, capacity, fill=np.nan)
+            self._usage = _grow(self._usage, capacity)
+
+        self._id_to_idx[knowledge_id] = index
+        self._ids.append(knowledge_id)
+        return index
+
+    def _add_edges(self, src: np.ndarray, dst: np.ndarray):
+        end = self._edge_count + len(src)
+        if end > len(self._edge_src):
+            capacity = max(64, 2 * end)
+            self._edge_src = _grow(self._edge_src, capacity)
+            self._edge_dst = _grow(self._edge_dst, capacity)
+
+        self._edge_src[self._edge_count:end] = src
+        self._edge_dst[self._edge_count:end] = dst
+        self._edge_count = end
+
+    def _index_knowledge(self, knowledge_id: str, knowledge_data: dict):
+        for field, index in self._indexes.items():
+            if field in knowledge_data and isinstance(knowledge_data[field], Hashable):
+                index.setdefault(knowledge_data[field], set()).add(knowledge_id)
+
+    def _calculate_centrality(self) -> np.ndarray:
+        matrix_size = len(self._ids)
         if matrix_size == 0:
-            return {}
-
-        # Create adjacency matrix
-        adjacency_matrix = np.zeros((matrix_size, matrix_size))
-        id_to_index = {id_: i for i, id_ in enumerate(self.knowledge_graph.keys())}
-
-        for id_, connections in self.connections.items():
-            for connected_id in connections:
-                i = id_to_index[id_]
-                j = id_to_index[connected_id]
-                adjacency_matrix[i, j] = 1
-
-        # Calculate eigenvector centrality
-        eigenvalues, eigenvectors = np.linalg.eig(adjacency_matrix.T)
-        centrality_vector = eigenvectors[:, eigenvalues.argmax()].real
+            return np.zeros(0)
+
+        # Create sparse adjacency matrix straight from the edge arrays
+        adjacency_matrix = sparse.csr_matrix(
+            (
+                np.ones(self._edge_count, dtype=np.float32),
+                (self._edge_src[:self._edge_count], self._edge_dst[:self._edge_count])
+            ),
+            shape=(matrix_size, matrix_size)
+        )
+        adjacency_matrix.sum_duplicates()
+        adjacency_matrix.data[:] = 1
+
+        if adjacency_matrix.nnz == 0:
+            return np.full(matrix_size, 1.0 / matrix_size)
+
+        # Calculate eigenvector centrality on the symmetrized graph, which lets
+        # ARPACK use Lanczos; graphs too small for ARPACK are solved densely
+        symmetric_matrix = adjacency_matrix.maximum(adjacency_matrix.T)
+        if matrix_size < 3:
+            _, eigenvectors = np.linalg.eigh(symmetric_matrix.toarray())
+            centrality_vector = eigenvectors[:, -1]
+        else:
+            _, eigenvectors = linalg.eigsh(
+                symmetric_matrix,
+                k=1,
+                which='LA',
+                v0=np.ones(matrix_size, dtype=np.float32),
+                maxiter=200,
+                tol=1e-5
+            )
+            centrality_vector = eigenvectors[:, 0]
 
-        # Normalize and convert to dictionary
-        centrality_vector = centrality_vector / centrality_vector.sum()
-        return {
-            id_: centrality_vector[i]
-            for id_, i in id_to_index.items()
-        }
+        # Normalize, aligned with _ids
+        centrality_vector = np.abs(centrality_vector)
+        return centrality_vector / centrality_vector.sum()
 
-    async def _calculate_performance_metrics(self, knowledge_id: str):
-        try:
-            knowledge_data = self.knowledge_graph[knowledge_id]
+    def _metric_inputs(self, knowledge_data: dict) -> Tuple[float, float]:
+        ts_epoch = datetime.fromisoformat(knowledge_data.get('timestamp', '')).timestamp()
+        return ts_epoch, float(knowledge_data.get('usage_count', 0))
 
-            # Calculate base score from metadata
-            timestamp = datetime.fromisoformat(knowledge_data.get('timestamp', ''))
-            age_factor = 1 / (1 + (datetime.now() - timestamp).days)
+    def _score_nodes(self, indices: np.ndarray):
+        # Calculate base score from metadata
+        age_days = (time.time() - self._timestamps[indices]) // 86400
+        with np.errstate(divide='ignore', invalid='ignore'):
+            age_factor = 1 / (1 + age_days)
 
-            # Calculate usage score
-            usage_count = knowledge_data.get('usage_count', 0)
-            usage_factor = np.log1p(usage_count)
+        # Calculate usage score
+        usage_factor = np.log1p(self._usage[indices])
 
-            # Combine scores
-            self.performance_metrics[knowledge_id] = (
-                    0.4 * age_factor + 0.6 * usage_factor
-            )
-        except Exception as e:
-            self.logger.error(f"Failed to calculate performance metrics: {str(e)}")
+        # Combine scores, leaving nodes without a usable timestamp untouched
+        scores = 0.4 * age_factor + 0.6 * usage_factor
+        valid = np.isfinite(scores)
+        self._perf[indices[valid]] = scores[valid]
 
     def _matches_query(self, knowledge_data: dict, query_params: dict) -> bool:
         for key, value in query_params.items():
@@ -158,13 +309,25 @@ class LearningPathway:
         return True
 
     async def _prune_connections(self):
-        threshold = np.mean(list(self.performance_metrics.values()))
+        performance = self._perf[:len(self._ids)]
+        if len(performance) == 0:
+            return
+
+        # Drop every edge into a below-average node in one pass, compacting
+        # the survivors to the front of the arrays in their original order
+        keep = performance[self._edge_dst[:self._edge_count]] >= performance.mean()
+        kept = int(keep.sum())
+        self._edge_src[:kept] = self._edge_src[:self._edge_count][keep]
+        self._edge_dst[:kept] = self._edge_dst[:self._edge_count][keep]
+        self._edge_count = kept
+
+
+def _tokenize(content: Any) -> Set[str]:
+    # Content is only split on whitespace, so there is no need to serialize it
+    return set(str(content).split())
 
-        pruned_connections = {}
-        for knowledge_id, connections in self.connections.items():
-            pruned_connections[knowledge_id] = [
-                conn_id for conn_id in connections
-                if self.performance_metrics.get(conn_id, 0) >= threshold
-            ]
 
-        self.connections = pruned_connections
\ No newline at end of file
+def _grow(array: np.ndarray, capacity: int, fill: float = 0) -> np.ndarray:
+    grown = np.full(capacity, fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
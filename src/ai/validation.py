@@ -1,31 +1,45 @@
-from typing import Dict, Any
+from typing import Any, Optional, Tuple
+from functools import lru_cache
+import hashlib
 import json
+import orjson
 import asyncio
 import logging
+import time
+from collections import OrderedDict
 from datetime import datetime
 
 
 class KnowledgeValidator:
+    REQUIRED_FIELDS = frozenset({
+        'content', 'domain', 'contributor', 'timestamp',
+        'version', 'metadata', 'dependencies'
+    })
+    REQUIRED_ALGORITHM_FIELDS = frozenset({'name', 'parameters', 'complexity'})
+    REQUIRED_DATA_ENTRY_FIELDS = frozenset({'input', 'output', 'metadata'})
+
     def __init__(self, threshold: float):
         self.threshold = threshold
         self.logger = logging.getLogger(__name__)
-        self.required_fields = {
-            'content', 'domain', 'contributor', 'timestamp',
-            'version', 'metadata', 'dependencies'
-        }
-        self.validation_cache: Dict[str, tuple] = {}
+        self.required_fields = self.REQUIRED_FIELDS
+        self.validation_cache: OrderedDict[bytes, tuple] = OrderedDict()
+        self.cache_max = 10_000
+        self.cache_ttl = 3600  # 1 hour cache
 
-    async def validate_knowledge(self, knowledge_data: dict) -> bool:
+    async def validate_knowledge(self, knowledge_data: dict, cache_key: Optional[bytes] = None) -> bool:
         try:
-            # Generate cache key
-            cache_key = self._generate_cache_key(knowledge_data)
+            # Generate cache key unless the caller already hashed the payload
+            if cache_key is None:
+                cache_key = self._generate_cache_key(knowledge_data)
 
             # Check cache
             cached_result = self.validation_cache.get(cache_key)
             if cached_result:
                 timestamp, result = cached_result
-                if (datetime.now() - timestamp).total_seconds() < 3600:  # 1 hour cache
+                if time.monotonic() - timestamp < self.cache_ttl:
+                    self.validation_cache.move_to_end(cache_key)
                     return result
+                del self.validation_cache[cache_key]
 
             # Structural validation
             if not self._validate_structure(knowledge_data):
@@ -44,18 +58,20 @@ class KnowledgeValidator:
             if not self._validate_version(knowledge_data):
                 return False
 
-            # Cache result
-            self.validation_cache[cache_key] = (datetime.now(), True)
+            # Cache result, evicting the least recently used entry when full
+            self.validation_cache[cache_key] = (time.monotonic(), True)
+            if len(self.validation_cache) > self.cache_max:
+                self.validation_cache.popitem(last=False)
             return True
 
         except Exception as e:
-            self.logger.error(f"Validation failed: {str(e)}")
+            self.logger.error("Validation failed: %s", e)
             return False
 
     def _validate_structure(self, knowledge_data: dict) -> bool:
         try:
             # Check required fields
-            if not all(field in knowledge_data for field in self.required_fields):
+            if not self.required_fields <= knowledge_data.keys():
                 return False
 
             # Validate content structure
@@ -77,7 +93,7 @@ class KnowledgeValidator:
             return True
 
         except Exception as e:
-            self.logger.error(f"Structure validation failed: {str(e)}")
+            self.logger.error("Structure validation failed: %s", e)
             return False
 
     async def _validate_content(self, knowledge_data: dict) -> float:
@@ -105,7 +121,7 @@ class KnowledgeValidator:
             return sum(validation_scores) / len(validation_scores)
 
         except Exception as e:
-            self.logger.error(f"Content validation failed: {str(e)}")
+            self.logger.error("Content validation failed: %s", e)
             return 0.0
 
     async def _validate_dependencies(self, knowledge_data: dict) -> bool:
@@ -126,7 +142,7 @@ class KnowledgeValidator:
             return True
 
         except Exception as e:
-            self.logger.error(f"Dependencies validation failed: {str(e)}")
+            self.logger.error("Dependencies validation failed: %s", e)
             return False
 
     def _validate_version(self, knowledge_data: dict) -> bool:
@@ -134,15 +150,10 @@ class KnowledgeValidator:
             version = knowledge_data.get('version', '')
 
             # Version should be in format 'x.y.z'
-            version_parts = version.split('.')
-            if len(version_parts) != 3:
-                return False
-
-            # Each part should be a non-negative integer
-            return all(part.isdigit() for part in version_parts)
+            return _parse_semver(version) is not None
 
         except Exception as e:
-            self.logger.error(f"Version validation failed: {str(e)}")
+            self.logger.error("Version validation failed: %s", e)
             return False
 
     def _validate_model_weights(self, content: dict) -> float:
@@ -177,9 +188,8 @@ class KnowledgeValidator:
     def _validate_algorithm(self, content: dict) -> float:
         try:
             algorithm = content.get('algorithm', {})
-            required_algo_fields = {'name', 'parameters', 'complexity'}
 
-            if not all(field in algorithm for field in required_algo_fields):
+            if not self.REQUIRED_ALGORITHM_FIELDS <= algorithm.keys():
                 return 0.0
 
             return 1.0
@@ -189,7 +199,10 @@ class KnowledgeValidator:
 
     def _validate_content_size(self, content: dict) -> float:
         try:
-            content_size = len(json.dumps(content))
+            try:
+                content_size = len(orjson.dumps(content))
+            except orjson.JSONEncodeError:
+                content_size = len(json.dumps(content, separators=(',', ':'), ensure_ascii=False).encode())
             max_size = 1024 * 1024  # 1MB
 
             if content_size > max_size:
@@ -203,23 +216,50 @@ class KnowledgeValidator:
     def _validate_dependency_version(self, dependency: dict) -> bool:
         try:
             version = dependency.get('version', '')
-            version_parts = version.split('.')
 
-            return len(version_parts) == 3 and all(part.isdigit() for part in version_parts)
+            return _parse_semver(version) is not None
 
         except Exception:
             return False
 
     def _validate_data_entry(self, entry: dict) -> bool:
         try:
-            required_fields = {'input', 'output', 'metadata'}
-            return all(field in entry for field in required_fields)
+            return self.REQUIRED_DATA_ENTRY_FIELDS <= entry.keys()
         except Exception:
             return False
 
-    def _generate_cache_key(self, knowledge_data: dict) -> str:
-        try:
-            content = json.dumps(knowledge_data, sort_keys=True)
-            return str(hash(content))
-        except Exception:
-            return str(hash(str(knowledge_data)))
\ No newline at end of file
+    def _generate_cache_key(self, knowledge_data: dict) -> bytes:
+        return knowledge_digest(knowledge_data)
+
+
+def knowledge_digest(knowledge_data: dict) -> bytes:
+    # SHA-256 of the key-sorted compact JSON, so the validation cache and
+    # the exchange hash a payload identically
+    try:
+        content = orjson.dumps(knowledge_data, option=orjson.OPT_SORT_KEYS)
+    except orjson.JSONEncodeError:
+        # orjson only handles 64-bit integers; the stdlib encoder takes any
+        content = json.dumps(
+            knowledge_data,
+            sort_keys=True,
+            separators=(',', ':'),
+            ensure_ascii=False
+        ).encode()
+    return hashlib.sha256(content).digest()
+
+
+@lru_cache(maxsize=1024)
+def _parse_semver(version: str) -> Optional[Tuple[int, int, int]]:
+    if not isinstance(version, str):
+        return None
+
+    # Each part should be a non-negative integer
+    parts = version.split('.')
+    if len(parts) != 3 or not all(part.isdigit() for part in parts):
+        return None
+
+    try:
+        major, minor, patch = map(int, parts)
+    except ValueError:
+        return None
+    return major, minor, patch
@@ -1,26 +1,50 @@
-from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import itertools
+import os
 import time
 import jwt
 import logging
-from typing import Callable, Awaitable
+from cachetools import TTLCache
 from src.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 
-async def rate_limit_handler(request: Request, call_next):
-    client_ip = request.client.host
-    current_time = time.time()
+# Request ids are the pid followed by a per-process counter: unique and sortable
+_request_counter = itertools.count(1)
+_pid_prefix = f"{os.getpid():04x}"
+
+RATE_LIMIT_REQUESTS = 100  # requests per minute
+RATE_LIMIT_WINDOW = 60  # seconds
+
+# Decoded tokens are cached briefly so repeat requests skip HMAC verification
+TOKEN_CACHE = TTLCache(maxsize=4096, ttl=30)
+SIGNING_KEY = settings.SECRET_KEY.encode() if settings.SECRET_KEY else None
+ALGORITHMS = ('HS256',)
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization'
+}
 
-    # Initialize rate limiting for new IP
-    if client_ip not in request.app.state.rate_limits:
-        request.app.state.rate_limits[client_ip] = {
-            'requests': [],
-            'blocked_until': 0
-        }
 
-    client_limits = request.app.state.rate_limits[client_ip]
+def check_rate_limit(rate_limits: TTLCache, client_ip: str):
+    current_time = time.monotonic()
+
+    # Initialize token bucket for new IP; re-storing the entry keeps active
+    # clients from expiring out of the TTL cache
+    client_limits = rate_limits.get(client_ip)
+    if client_limits is None:
+        client_limits = {
+            'tokens': float(RATE_LIMIT_REQUESTS),
+            'last': current_time,
+            'blocked_until': 0.0
+        }
+    rate_limits[client_ip] = client_limits
 
     # Check if client is blocked
     if current_time < client_limits['blocked_until']:
@@ -29,51 +53,43 @@ async def rate_limit_handler(request: Request, call_next):
             detail="Too many requests. Please try again later."
         )
 
-    # Clean old requests
-    client_limits['requests'] = [
-        req_time for req_time in client_limits['requests']
-        if current_time - req_time < 60  # 1 minute window
-    ]
+    # Refill tokens for the time elapsed since the last request
+    elapsed = current_time - client_limits['last']
+    client_limits['tokens'] = min(
+        RATE_LIMIT_REQUESTS,
+        client_limits['tokens'] + elapsed * (RATE_LIMIT_REQUESTS / RATE_LIMIT_WINDOW)
+    )
+    client_limits['last'] = current_time
 
     # Check rate limit
-    if len(client_limits['requests']) >= 100:  # 100 requests per minute
-        client_limits['blocked_until'] = current_time + 60
+    if client_limits['tokens'] < 1:
+        client_limits['blocked_until'] = current_time + RATE_LIMIT_WINDOW
         raise HTTPException(
             status_code=429,
             detail="Rate limit exceeded. Please try again in 1 minute."
         )
 
-    # Add current request
-    client_limits['requests'].append(current_time)
-
-    return await call_next(request)
+    # Consume a token for the current request
+    client_limits['tokens'] -= 1
 
 
-async def error_handler(request: Request, call_next):
-    try:
-        return await call_next(request)
-    except HTTPException as e:
-        return JSONResponse(
-            status_code=e.status_code,
-            content={"error": e.detail}
-        )
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        return JSONResponse(
-            status_code=500,
-            content={"error": "Internal server error"}
+def decode_token(token: str) -> dict:
+    # Cached payloads are only reused while the token itself is unexpired
+    payload = TOKEN_CACHE.get(token)
+    if payload is None or payload.get('exp', float('inf')) <= time.time():
+        payload = jwt.decode(
+            token,
+            SIGNING_KEY,
+            algorithms=ALGORITHMS
         )
+        TOKEN_CACHE[token] = payload
 
+    return dict(payload)
 
-async def auth_handler(
-        request: Request,
-        call_next: Callable[[Request], Awaitable[JSONResponse]]
-):
-    if request.url.path.startswith("/api/v1/public"):
-        return await call_next(request)
 
+def authenticate(headers: Headers) -> dict:
     try:
-        auth_header = request.headers.get('Authorization')
+        auth_header = headers.get('Authorization')
         if not auth_header or not auth_header.startswith('Bearer '):
             raise HTTPException(
                 status_code=401,
@@ -82,73 +98,105 @@ async def auth_handler(
 
         token = auth_header.split(' ')[1]
         try:
-            payload = jwt.decode(
-                token,
-                settings.SECRET_KEY,
-                algorithms=['HS256']
-            )
-            request.state.user = payload
+            return decode_token(token)
         except jwt.InvalidTokenError:
             raise HTTPException(
                 status_code=401,
                 detail="Invalid authentication token"
             )
-
-        return await call_next(request)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Authentication error: {str(e)}")
+        logger.error("Authentication error: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Internal authentication error"
         )
 
 
-async def cors_handler(request: Request, call_next):
-    response = await call_next(request)
+# CORS, error handling, auth, rate limiting and request context fused into a
+# single ASGI layer. CORS headers are added by the outermost send wrapper, so
+# error responses carry them too; the rest run in order from the outside in
+class UnifiedMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.logger = logging.getLogger(__name__)
 
-    response.headers['Access-Control-Allow-Origin'] = '*'
-    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
 
-    return response
+        response_started = False
 
+        async def send_with_cors(message: Message):
+            nonlocal response_started
+            if message['type'] == 'http.response.start':
+                response_started = True
+                MutableHeaders(scope=message).update(CORS_HEADERS)
+            await send(message)
 
-class RequestContextHandler:
-    def __init__(self):
-        self.logger = logging.getLogger(__name__)
+        try:
+            await self._handle(scope, receive, send_with_cors)
+            return
+        except HTTPException as e:
+            response = ORJSONResponse(
+                status_code=e.status_code,
+                content={"error": e.detail}
+            )
+        except Exception as e:
+            if response_started:
+                raise
+            self.logger.error("Unexpected error: %s", e)
+            response = ORJSONResponse(
+                status_code=500,
+                content={"error": "Internal server error"}
+            )
 
-    async def __call__(self, request: Request, call_next):
-        request_id = str(time.time())
-        request.state.request_id = request_id
+        await response(scope, receive, send_with_cors)
 
-        # Log request
-        self.logger.info(
-            f"Request {request_id}: {request.method} {request.url.path}"
+    async def _handle(self, scope: Scope, receive: Receive, send: Send):
+        state = scope.setdefault('state', {})
+
+        if not scope['path'].startswith("/api/v1/public"):
+            state['user'] = authenticate(Headers(scope=scope))
+
+        client = scope.get('client')
+        check_rate_limit(
+            scope['app'].state.rate_limits,
+            client[0] if client else 'unknown'
         )
 
-        start_time = time.time()
-        response = await call_next(request)
-        duration = time.time() - start_time
+        request_id = f"{_pid_prefix}{next(_request_counter):012x}"
+        state['request_id'] = request_id
 
-        # Log response
+        # Log request
         self.logger.info(
-            f"Request {request_id} completed in {duration:.2f}s with status {response.status_code}"
+            "Request %s: %s %s", request_id, scope['method'], scope['path']
         )
 
-        response.headers['X-Request-ID'] = request_id
-        response.headers['X-Response-Time'] = f"{duration:.2f}s"
+        start_time = time.perf_counter()
+
+        async def send_with_context(message: Message):
+            if message['type'] == 'http.response.start':
+                duration = time.perf_counter() - start_time
 
-        return response
+                # Log response
+                self.logger.info(
+                    "Request %s completed in %.2fs with status %s",
+                    request_id, duration, message['status']
+                )
+
+                headers = MutableHeaders(scope=message)
+                headers['X-Request-ID'] = request_id
+                headers['X-Response-Time'] = f"{duration:.2f}s"
+            await send(message)
+
+        await self.app(scope, receive, send_with_context)
 
 
 def setup_handlers(app):
-    app.middleware("http")(RequestContextHandler())
-    app.middleware("http")(rate_limit_handler)
-    app.middleware("http")(auth_handler)
-    app.middleware("http")(error_handler)
-    app.middleware("http")(cors_handler)
-
-    # Initialize rate limiting state
-    app.state.rate_limits = {}
\ No newline at end of file
+    app.add_middleware(UnifiedMiddleware)
+
+    # Initialize rate limiting state; idle clients expire after 5 minutes
+    app.state.rate_limits = TTLCache(maxsize=100_000, ttl=300)
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
 from typing import List, Optional
 from pydantic import BaseModel
+import msgspec
 from src.blockchain.solana_client import SolanaClient
 from src.ai.knowledge_exchange import KnowledgeExchange
 from datetime import datetime
@@ -8,7 +9,7 @@ from datetime import datetime
 router = APIRouter()
 
 
-class KnowledgeSubmission(BaseModel):
+class KnowledgeSubmission(msgspec.Struct, kw_only=True):
     content: dict
     domain: str
     contributor: str
@@ -24,16 +25,24 @@ class QueryParams(BaseModel):
     limit: int = 10
 
 
+async def decode_body(request: Request, submission_type: type):
+    try:
+        return msgspec.json.decode(await request.body(), type=submission_type)
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
 @router.post("/knowledge/submit")
 async def submit_knowledge(
-        submission: KnowledgeSubmission,
+        request: Request,
         exchange: KnowledgeExchange = Depends(lambda: router.knowledge_exchange)
 ):
+    submission = await decode_body(request, KnowledgeSubmission)
     try:
         if not submission.timestamp:
             submission.timestamp = datetime.now().isoformat()
 
-        knowledge_data = submission.dict()
+        knowledge_data = msgspec.structs.asdict(submission)
         transaction_id = await exchange.submit_knowledge(knowledge_data)
 
         return {
@@ -47,6 +56,32 @@ async def submit_knowledge(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/knowledge/submit/batch")
+async def submit_knowledge_batch(
+        request: Request,
+        exchange: KnowledgeExchange = Depends(lambda: router.knowledge_exchange)
+):
+    submissions = await decode_body(request, List[KnowledgeSubmission])
+    try:
+        timestamp = datetime.now().isoformat()
+        for submission in submissions:
+            if not submission.timestamp:
+                submission.timestamp = timestamp
+
+        knowledge_batch = [msgspec.structs.asdict(submission) for submission in submissions]
+        transaction_ids = await exchange.submit_knowledge_batch(knowledge_batch)
+
+        return {
+            "status": "success",
+            "transaction_ids": transaction_ids,
+            "message": "Knowledge submitted successfully"
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/knowledge/query")
 async def query_knowledge(
         query: QueryParams,
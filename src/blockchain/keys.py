@@ -0,0 +1,22 @@
+from solana.keypair import Keypair
+from solana.publickey import PublicKey
+from functools import lru_cache
+from src.config.settings import settings
+import json
+
+
+# Base58 decoding is pure CPU work that always gives the same key for the
+# same string, so repeat addresses are decoded once. Transactions built by
+# solana-py only accept its own PublicKey, so that is what comes back
+@lru_cache(maxsize=4096)
+def pk(address: str) -> PublicKey:
+    return PublicKey(address)
+
+
+def load_keypair(path: str) -> Keypair:
+    # Solana CLI keypair file: a JSON array of the 64 secret key bytes
+    with open(path) as f:
+        return Keypair.from_secret_key(bytes(json.load(f)))
+
+
+TOKEN_MINT = pk(settings.TOKEN_MINT_ADDRESS) if settings.TOKEN_MINT_ADDRESS else None
@@ -1,40 +1,88 @@
 from solana.rpc.async_api import AsyncClient
+from solana.rpc.providers.async_http import AsyncHTTPProvider
+from solders.transaction_status import TransactionConfirmationStatus, TransactionStatus
 from solana.transaction import Transaction
 from solana.keypair import Keypair
 from solders.pubkey import Pubkey
+from solders.signature import Signature
 from solders.system_program import TransferParams, transfer
+from src.blockchain.keys import TOKEN_MINT, load_keypair
+from src.blockchain.token_manager import TokenManager
 from src.config.settings import settings
+from typing import List, Optional
 import asyncio
+import httpx
 import logging
 
+SIGNATURE_STATUS_LIMIT = 256  # signatures per getSignatureStatuses request
+CONFIRMATION_ATTEMPTS = 6
+CONFIRMATION_BACKOFF = 0.5  # seconds before the first re-poll, doubled each time
+
+
+CONFIRMED_STATUSES = (TransactionConfirmationStatus.Confirmed, TransactionConfirmationStatus.Finalized)
+
+
+class PooledHTTPProvider(AsyncHTTPProvider):
+    # The stock provider opens a private session; this one runs on the
+    # session it is given and otherwise parses responses the same way
+    def __init__(self, endpoint: str, session: httpx.AsyncClient):
+        super(AsyncHTTPProvider, self).__init__(endpoint)
+        self.session = session
+
+
+class PooledAsyncClient(AsyncClient):
+    def __init__(self, endpoint: str, session: httpx.AsyncClient):
+        super(AsyncClient, self).__init__()
+        self._provider = PooledHTTPProvider(endpoint, session)
+
 
 class SolanaClient:
     def __init__(self, rpc_url: str, network: str):
-        self.client = AsyncClient(rpc_url)
+        # Keep one pooled session for the process lifetime so RPC calls reuse
+        # kept-alive connections (multiplexed when the endpoint speaks HTTP/2)
+        # instead of re-handshaking; client.close() in cleanup closes it
+        self.client = PooledAsyncClient(rpc_url, httpx.AsyncClient(
+            http2=settings.SOLANA_RPC_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.SOLANA_RPC_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SOLANA_RPC_MAX_KEEPALIVE
+            ),
+            timeout=settings.SOLANA_RPC_TIMEOUT
+        ))
         self.network = network
         self.logger = logging.getLogger(__name__)
         self._keypair = None
+        self.token_manager = None
         self._initialized = False
 
     async def initialize(self):
         try:
             version = await self.client.get_version()
-            self.logger.info(f"Connected to Solana {self.network}, version: {version['result']}")
+            self.logger.info("Connected to Solana %s, version: %s", self.network, version.value.solana_core)
             self._initialized = True
             await self._initialize_protocol_account()
         except Exception as e:
-            self.logger.error(f"Failed to initialize Solana client: {str(e)}")
+            self.logger.error("Failed to initialize Solana client: %s", e)
             raise
 
     async def _initialize_protocol_account(self):
         if not self._keypair:
             self._keypair = Keypair()
 
+        # Rewards are paid from the configured authority's holdings of the
+        # mint; without both, rewards stay disabled
+        if TOKEN_MINT is not None and settings.REWARD_AUTHORITY_KEYPAIR:
+            self.token_manager = TokenManager(
+                self.client,
+                TOKEN_MINT,
+                load_keypair(settings.REWARD_AUTHORITY_KEYPAIR)
+            )
+
         try:
             balance = await self.client.get_balance(self._keypair.public_key)
-            self.logger.info(f"Protocol account balance: {balance['result']['value']} lamports")
+            self.logger.info("Protocol account balance: %s lamports", balance.value)
         except Exception as e:
-            self.logger.error(f"Failed to initialize protocol account: {str(e)}")
+            self.logger.error("Failed to initialize protocol account: %s", e)
             raise
 
     async def get_token_supply(self, token_mint: Pubkey) -> int:
@@ -42,7 +90,7 @@ class SolanaClient:
             supply = await self.client.get_token_supply(token_mint)
             return supply['result']['value']['amount']
         except Exception as e:
-            self.logger.error(f"Failed to get token supply: {str(e)}")
+            self.logger.error("Failed to get token supply: %s", e)
             raise
 
     async def get_token_holders(self, token_mint: Pubkey) -> list:
@@ -53,7 +101,7 @@ class SolanaClient:
             )
             return accounts['result']['value']
         except Exception as e:
-            self.logger.error(f"Failed to get token holders: {str(e)}")
+            self.logger.error("Failed to get token holders: %s", e)
             raise
 
     async def submit_knowledge_transaction(self, knowledge_data: dict, signature: bytes) -> str:
@@ -69,7 +117,7 @@ class SolanaClient:
 
             return result['result']
         except Exception as e:
-            self.logger.error(f"Failed to submit knowledge transaction: {str(e)}")
+            self.logger.error("Failed to submit knowledge transaction: %s", e)
             raise
 
     async def verify_transaction(self, signature: str) -> bool:
@@ -77,9 +125,59 @@ class SolanaClient:
             result = await self.client.confirm_transaction(signature)
             return result['result']['value']
         except Exception as e:
-            self.logger.error(f"Failed to verify transaction: {str(e)}")
+            self.logger.error("Failed to verify transaction: %s", e)
             return False
 
+    async def verify_transactions(self, signatures: List[str]) -> List[bool]:
+        # Poll all pending signatures together, backing off once per round for
+        # the whole batch rather than per signature
+        verified = [False] * len(signatures)
+        delay = CONFIRMATION_BACKOFF
+
+        # The RPC client takes solders signatures; parse them once up front.
+        # A malformed signature can never confirm, so only it stays False
+        parsed = {}
+        for i, signature in enumerate(signatures):
+            try:
+                parsed[i] = Signature.from_string(signature)
+            except (TypeError, ValueError) as e:
+                self.logger.error("Invalid transaction signature %r: %s", signature, e)
+        pending = list(parsed)
+
+        try:
+            for attempt in range(CONFIRMATION_ATTEMPTS):
+                statuses = await self._get_signature_statuses([parsed[i] for i in pending])
+
+                still_pending = []
+                for i, status in zip(pending, statuses):
+                    if status is not None and status.err is not None:
+                        continue  # Failed transactions will never confirm
+                    if status is not None and status.confirmation_status in CONFIRMED_STATUSES:
+                        verified[i] = True
+                    else:
+                        still_pending.append(i)
+                pending = still_pending
+
+                if not pending or attempt == CONFIRMATION_ATTEMPTS - 1:
+                    break
+                await asyncio.sleep(delay)
+                delay *= 2
+        except Exception as e:
+            self.logger.error("Failed to verify transactions: %s", e)
+
+        return verified
+
+    async def _get_signature_statuses(self, signatures: List[Signature]) -> List[Optional[TransactionStatus]]:
+        chunks = await asyncio.gather(*(
+            self.client.get_signature_statuses(signatures[i:i + SIGNATURE_STATUS_LIMIT])
+            for i in range(0, len(signatures), SIGNATURE_STATUS_LIMIT)
+        ))
+        return [
+            status
+            for statuses in chunks
+            for status in statuses.value
+        ]
+
     async def cleanup(self):
         if self._initialized:
             await self.client.close()
\ No newline at end of file
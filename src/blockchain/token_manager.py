@@ -1,73 +1,391 @@
 from solana.rpc.async_api import AsyncClient
-from solders.pubkey import Pubkey
+from solana.rpc.core import RPCException
+from solana.blockhash import Blockhash
+from solana.keypair import Keypair
+from solana.publickey import PublicKey
+from solana.transaction import AccountMeta, Transaction, TransactionInstruction
+from solders.rpc.responses import SendTransactionResp
+from solders.transaction_status import TransactionErrorFieldless
 from spl.token.instructions import get_associated_token_address, create_associated_token_account
 from spl.token.constants import TOKEN_PROGRAM_ID
+from cachetools import LRUCache, TTLCache
+from src.config.settings import settings
+import orjson
+from typing import Dict, List, Optional, Tuple
 import asyncio
 import logging
+import struct
+import time
+
+# SPL token Transfer instruction data: opcode followed by a u64 amount
+TRANSFER_INSTRUCTION = 3
+_TRANSFER_STRUCT = struct.Struct("<BQ")
+
+# Blockhashes stay valid for ~150 slots (about a minute); reuse one for half that
+BLOCKHASH_TTL = 30  # seconds
+
+# Consecutive RPC failures before calls fail fast, and for how long
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30  # seconds
+
+# getMultipleAccounts accepts at most this many keys per request
+MULTIPLE_ACCOUNTS_LIMIT = 100
+
+# Serialized transaction size budget, used to pack transfers and account
+# creations into as few transactions as fit
+MAX_TRANSACTION_SIZE = 1232  # bytes
+ACCOUNT_KEY_SIZE = 32  # new token account key when no transfer lists it
+TRANSACTION_BASE_SIZE = 198  # signature, header, blockhash, payer, source and token program
+TRANSFER_SIZE = 47  # recipient account key plus the compiled transfer
+CREATE_ACCOUNT_SIZE = 42  # owner key plus the compiled account creation
+CREATE_ACCOUNT_BASE_SIZE = 128  # mint, system, rent and associated token program keys
+
+
+class RPCUnavailable(Exception):
+    pass
 
 
 class TokenManager:
-    def __init__(self, solana_client: AsyncClient, token_mint: Pubkey):
+    def __init__(self, solana_client: AsyncClient, token_mint: PublicKey, authority: Optional[Keypair] = None):
         self.client = solana_client
-        self.token_mint = token_mint
+        # solana-py's transaction and SPL helpers only accept its own
+        # PublicKey, so keys are converted as they come in
+        self.token_mint = PublicKey(token_mint)
+        self.authority = authority
+        # The authority's own token account funds every transfer; deriving it
+        # is a program address search, so do it once
+        self.source_account = (
+            get_associated_token_address(authority.public_key, self.token_mint)
+            if authority is not None else None
+        )
         self.logger = logging.getLogger(__name__)
 
-    async def create_token_account(self, owner: Pubkey) -> Pubkey:
+        # Associated token address per owner; deriving one is a program
+        # address search, and the mint never changes for this manager
+        self._ata_by_owner = LRUCache(maxsize=100_000)
+
+        # Whole tokens to base units
+        self.amount_scale = settings.TOKEN_AMOUNT_SCALE
+
+        # Token accounts known to exist, so repeat recipients skip the RPC
+        # lookup; only positives are cached
+        self._ata_exists = TTLCache(maxsize=100_000, ttl=settings.ATA_CACHE_TTL)
+
+        # Recent blockhash shared by every transaction sent within its TTL
+        self._cached_blockhash = None
+        self._blockhash_expires = 0.0
+
+        # Circuit breaker state; _open_until is zero while the circuit is closed
+        self._fail_count = 0
+        self._open_until = 0.0
+
+    async def create_token_account(self, owner: PublicKey) -> PublicKey:
+        return (await self.create_token_accounts([owner]))[0]
+
+    async def create_token_accounts(self, owners: List[PublicKey]) -> List[PublicKey]:
         try:
-            associated_token_address = get_associated_token_address(
-                owner,
-                self.token_mint
-            )
+            token_accounts, instructions = await self._prepare_token_accounts(owners)
 
-            if not await self._account_exists(associated_token_address):
-                instruction = create_associated_token_account(
-                    payer=owner,
-                    owner=owner,
-                    mint=self.token_mint
+            if instructions:
+                results = await self._send_transactions(
+                    [(instruction, None) for instruction in instructions.values()],
+                    list(instructions)
                 )
-                await self.client.send_transaction(instruction)
+                failed = results.count(None)
+                if failed:
+                    raise RuntimeError(f"{failed} of {len(results)} token accounts were not created")
 
-            return associated_token_address
+            return token_accounts
+        except RPCUnavailable:
+            raise
         except Exception as e:
-            self.logger.error(f"Failed to create token account: {str(e)}")
+            self.logger.error("Failed to create token accounts: %s", e)
             raise
 
-    async def get_token_balance(self, token_account: Pubkey) -> int:
+    async def get_token_balance(self, token_account: PublicKey) -> Optional[int]:
+        return (await self.get_token_balances([token_account]))[0]
+
+    async def get_token_balances(self, token_accounts: List[PublicKey]) -> List[Optional[int]]:
         try:
-            balance = await self.client.get_token_account_balance(token_account)
-            return balance['result']['value']['amount']
+            # Amounts arrive as strings and are converted once here; missing
+            # accounts have no balance and come back as None
+            accounts = await self._get_multiple_accounts(token_accounts, self._get_parsed_accounts)
+            return [
+                int(account['data']['parsed']['info']['tokenAmount']['amount'])
+                if account is not None else None
+                for account in accounts
+            ]
+        except RPCUnavailable:
+            raise
         except Exception as e:
-            self.logger.error(f"Failed to get token balance: {str(e)}")
+            self.logger.error("Failed to get token balances: %s", e)
             raise
 
-    async def distribute_rewards(self, recipient: Pubkey, amount: int) -> str:
+    async def distribute_rewards(self, recipient: PublicKey, amount: int) -> str:
+        return (await self.distribute_rewards_batch([(recipient, amount)]))[0]
+
+    async def distribute_rewards_batch(self, recipients: List[Tuple[PublicKey, int]]) -> List[Optional[str]]:
+        # Returns one entry per recipient, in the order given: the signature of
+        # the transaction that paid it, or None if that transaction failed.
+        # Recipients packed into the same transaction share its signature
         try:
-            token_account = await self.create_token_account(recipient)
+            keys = [PublicKey(recipient) for recipient, _ in recipients]
+
+            # Merge repeat recipients so each token account is created and
+            # credited by exactly one transaction
+            amounts: Dict[PublicKey, int] = {}
+            for recipient, (_, amount) in zip(keys, recipients):
+                amounts[recipient] = amounts.get(recipient, 0) + amount
+
+            token_accounts, create_instructions = await self._prepare_token_accounts(list(amounts))
 
-            transfer_instruction = self._create_transfer_instruction(
-                token_account,
-                amount
+            # Missing accounts are created in the same transaction that funds them
+            results = await self._send_transactions(
+                [
+                    (
+                        create_instructions.get(token_account),
+                        self._create_transfer_instruction(token_account, amount)
+                    )
+                    for token_account, amount in zip(token_accounts, amounts.values())
+                ],
+                token_accounts
             )
 
-            result = await self.client.send_transaction(transfer_instruction)
-            return result['result']
+            signatures = {
+                recipient: str(result.value) if result is not None else None
+                for recipient, result in zip(amounts, results)
+            }
+            return [signatures[recipient] for recipient in keys]
+        except RPCUnavailable:
+            raise
         except Exception as e:
-            self.logger.error(f"Failed to distribute rewards: {str(e)}")
+            self.logger.error("Failed to distribute rewards: %s", e)
             raise
 
-    async def _account_exists(self, address: Pubkey) -> bool:
+    async def _prepare_token_accounts(
+        self,
+        owners: List[PublicKey]
+    ) -> Tuple[List[PublicKey], Dict[PublicKey, TransactionInstruction]]:
+        # Resolve every associated token account with batched existence
+        # lookups and build creation instructions for the missing ones
+        owners = [PublicKey(owner) for owner in owners]
+        token_accounts = [self._token_account(owner) for owner in owners]
+        unknown = [
+            token_account for token_account in dict.fromkeys(token_accounts)
+            if token_account not in self._ata_exists
+        ]
+        exists = dict(zip(unknown, await self._accounts_exist(unknown)))
+        self._ata_exists.update(
+            (token_account, True) for token_account, found in exists.items() if found
+        )
+
+        instructions = {}
+        for owner, token_account in zip(owners, token_accounts):
+            if not exists.get(token_account, True) and token_account not in instructions:
+                instructions[token_account] = create_associated_token_account(
+                    payer=self._require_authority().public_key,
+                    owner=owner,
+                    mint=self.token_mint
+                )
+
+        return token_accounts, instructions
+
+    def _token_account(self, owner: PublicKey) -> PublicKey:
+        token_account = self._ata_by_owner.get(owner)
+        if token_account is None:
+            token_account = get_associated_token_address(owner, self.token_mint)
+            self._ata_by_owner[owner] = token_account
+        return token_account
+
+    async def _accounts_exist(self, addresses: List[PublicKey]) -> List[bool]:
+        accounts = await self._get_multiple_accounts(addresses, self._get_accounts)
+        return [account is not None for account in accounts]
+
+    async def _get_multiple_accounts(self, addresses: List[PublicKey], fetch) -> list:
+        # One request per 100 addresses, issued concurrently and flattened
+        # back into address order
+        chunks = await asyncio.gather(*(
+            self._call_rpc(fetch, addresses[i:i + MULTIPLE_ACCOUNTS_LIMIT])
+            for i in range(0, len(addresses), MULTIPLE_ACCOUNTS_LIMIT)
+        ))
+        return [account for accounts in chunks for account in accounts]
+
+    async def _get_accounts(self, addresses: List[PublicKey]) -> list:
+        return (await self.client.get_multiple_accounts(addresses)).value
+
+    async def _get_parsed_accounts(self, addresses: List[PublicKey]) -> List[Optional[dict]]:
+        # solana-py's jsonParsed helper decodes with the binary account
+        # parser and rejects parsed data, so this response is read directly
+        body = self.client._get_multiple_accounts_body(
+            pubkeys=addresses,
+            commitment=None,
+            encoding="jsonParsed",
+            data_slice=None
+        )
+        raw = await self.client._provider.make_request_unparsed(body)
+        response = orjson.loads(raw)
+        if 'error' in response:
+            raise RPCException(response['error'].get('message', response['error']))
+        return response['result']['value']
+
+    async def _send_transactions(
+        self,
+        pairs: List[Tuple[Optional[TransactionInstruction], Optional[TransactionInstruction]]],
+        token_accounts: List[PublicKey]
+    ) -> List[Optional[SendTransactionResp]]:
+        # Pack the creation/transfer pairs into transactions and send them
+        # all, even when some fail, so the caller knows exactly which pairs
+        # landed; each pair gets its transaction's result, or None if that
+        # transaction failed. Raises only when every transaction failed
+        groups = _pack_transfers(pairs)
+
+        # Warm the blockhash cache first so the concurrent sends below share
+        # one fetch instead of each missing the cache and fetching its own
+        await self._recent_blockhash()
+
+        results = await asyncio.gather(*(
+            self._send_transaction([
+                instruction
+                for i in group
+                for instruction in pairs[i]
+                if instruction is not None
+            ])
+            for group in groups
+        ), return_exceptions=True)
+
+        sent: List[Optional[SendTransactionResp]] = [None] * len(pairs)
+        failures = []
+        for group, result in zip(groups, results):
+            accounts = [token_accounts[i] for i in group]
+            if isinstance(result, BaseException):
+                # A failed send may mean a cached account is gone; re-check
+                # it on the next attempt
+                failures.append(result)
+                for token_account in accounts:
+                    self._ata_exists.pop(token_account, None)
+            else:
+                self._ata_exists.update(dict.fromkeys(accounts, True))
+                for i in group:
+                    sent[i] = result
+
+        if failures and len(failures) == len(results):
+            raise failures[0]
+        for failure in failures:
+            self.logger.error("Failed to send transaction: %s", failure)
+        return sent
+
+    async def _send_transaction(self, instructions: List[TransactionInstruction]) -> SendTransactionResp:
+        # Transactions reuse the cached blockhash instead of letting
+        # send_transaction fetch one each; a rejected blockhash is refreshed
+        # and the transaction rebuilt and signed once more
+        authority = self._require_authority()
+        for refresh in (False, True):
+            recent_blockhash = await self._recent_blockhash(refresh)
+            try:
+                return await self._call_rpc(
+                    self.client.send_transaction,
+                    Transaction(fee_payer=authority.public_key).add(*instructions),
+                    authority,
+                    recent_blockhash=recent_blockhash
+                )
+            except RPCException as e:
+                if refresh or not _blockhash_not_found(e):
+                    raise
+
+    async def _recent_blockhash(self, refresh: bool = False) -> Blockhash:
+        if refresh or self._cached_blockhash is None or time.monotonic() >= self._blockhash_expires:
+            blockhash = await self._call_rpc(self.client.get_latest_blockhash)
+            self._cached_blockhash = Blockhash(str(blockhash.value.blockhash))
+            self._blockhash_expires = time.monotonic() + BLOCKHASH_TTL
+        return self._cached_blockhash
+
+    async def _call_rpc(self, method, *args, **kwargs):
+        # After BREAKER_THRESHOLD consecutive failures, calls are rejected
+        # without touching the RPC for BREAKER_COOLDOWN seconds; once that
+        # passes, calls go through again and the first result decides
+        if self._open_until and time.monotonic() < self._open_until:
+            raise RPCUnavailable("Solana RPC unavailable")
+
         try:
-            account_info = await self.client.get_account_info(address)
-            return account_info['result']['value'] is not None
-        except Exception:
-            return False
-
-    def _create_transfer_instruction(self, recipient: Pubkey, amount: int):
-        return {
-            'programId': TOKEN_PROGRAM_ID,
-            'keys': [
-                {'pubkey': self.token_mint, 'isSigner': True, 'isWritable': True},
-                {'pubkey': recipient, 'isSigner': False, 'isWritable': True}
+            result = await method(*args, **kwargs)
+        except Exception as e:
+            self._fail_count += 1
+            if self._fail_count >= BREAKER_THRESHOLD and time.monotonic() >= self._open_until:
+                self._open_until = time.monotonic() + BREAKER_COOLDOWN
+                self.logger.error(
+                    "Solana RPC failed %d times in a row, pausing calls for %ds: %s",
+                    self._fail_count, BREAKER_COOLDOWN, e
+                )
+            raise
+
+        if self._open_until:
+            self.logger.info("Solana RPC recovered, resuming calls")
+        self._fail_count = 0
+        self._open_until = 0.0
+        return result
+
+    def _create_transfer_instruction(self, recipient: PublicKey, amount: int) -> TransactionInstruction:
+        # Same instruction spl.token.instructions.transfer builds, without
+        # going through its construct layout for every recipient
+        return TransactionInstruction(
+            keys=[
+                AccountMeta(pubkey=self.source_account, is_signer=False, is_writable=True),
+                AccountMeta(pubkey=recipient, is_signer=False, is_writable=True),
+                AccountMeta(pubkey=self._require_authority().public_key, is_signer=True, is_writable=False)
             ],
-            'data': bytes([2, *amount.to_bytes(8, 'little')])
-        }
\ No newline at end of file
+            program_id=TOKEN_PROGRAM_ID,
+            data=_TRANSFER_STRUCT.pack(TRANSFER_INSTRUCTION, amount)
+        )
+
+    def _require_authority(self) -> Keypair:
+        if self.authority is None:
+            raise RuntimeError("Token authority not configured")
+        return self.authority
+
+
+def _pack_transfers(
+    transfers: List[Tuple[Optional[TransactionInstruction], Optional[TransactionInstruction]]]
+) -> List[List[int]]:
+    # Greedily fill each transaction up to the size limit, keeping an account
+    # creation next to the transfer that depends on it; returns the indices
+    # of the pairs that go into each transaction
+    groups, group = [], []
+    size, creates = TRANSACTION_BASE_SIZE, False
+    for i, (create_instruction, transfer_instruction) in enumerate(transfers):
+        cost = _packed_size(create_instruction, transfer_instruction, creates)
+
+        if group and size + cost > MAX_TRANSACTION_SIZE:
+            groups.append(group)
+            group, size, creates = [], TRANSACTION_BASE_SIZE, False
+            cost = _packed_size(create_instruction, transfer_instruction, creates)
+
+        if create_instruction is not None:
+            creates = True
+        group.append(i)
+        size += cost
+
+    if group:
+        groups.append(group)
+    return groups
+
+
+def _blockhash_not_found(error: RPCException) -> bool:
+    # send_transaction raises with the preflight failure, whose data carries
+    # the transaction error
+    data = getattr(error.args[0], 'data', None) if error.args else None
+    err = getattr(data, 'err', None)
+    # solders refuses to compare a fieldless error with any other type
+    return isinstance(err, TransactionErrorFieldless) and err == TransactionErrorFieldless.BlockhashNotFound
+
+
+def _packed_size(
+    create_instruction: Optional[TransactionInstruction],
+    transfer_instruction: Optional[TransactionInstruction],
+    creates: bool
+) -> int:
+    # Bytes one creation/transfer pair adds to a transaction that already
+    # holds a creation when creates is set
+    size = TRANSFER_SIZE if transfer_instruction is not None else ACCOUNT_KEY_SIZE
+    if create_instruction is not None:
+        size += CREATE_ACCOUNT_SIZE + (0 if creates else CREATE_ACCOUNT_BASE_SIZE)
+    return size
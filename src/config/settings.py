@@ -1,32 +1,52 @@
 import os
+from dataclasses import dataclass, field
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+# Read once at import and frozen, so request handlers can use it freely
+@dataclass(frozen=True)
 class Settings:
     # Network Configuration
-    SOLANA_NETWORK = os.getenv("SOLANA_NETWORK", "mainnet-beta")
-    SOLANA_RPC_URL = os.getenv("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com")
+    SOLANA_NETWORK: str = os.getenv("SOLANA_NETWORK", "mainnet-beta")
+    SOLANA_RPC_URL: str = os.getenv("SOLANA_RPC_URL", "https://api.mainnet-beta.solana.com")
+    SOLANA_RPC_HTTP2: bool = os.getenv("SOLANA_RPC_HTTP2", "true").lower() == "true"
+    SOLANA_RPC_MAX_CONNECTIONS: int = int(os.getenv("SOLANA_RPC_MAX_CONNECTIONS", "64"))
+    SOLANA_RPC_MAX_KEEPALIVE: int = int(os.getenv("SOLANA_RPC_MAX_KEEPALIVE", "32"))
+    SOLANA_RPC_TIMEOUT: float = float(os.getenv("SOLANA_RPC_TIMEOUT", "30"))  # seconds
 
     # Token Configuration
-    TOKEN_MINT_ADDRESS = os.getenv("TOKEN_MINT_ADDRESS")
-    TOKEN_DECIMALS = 9
+    TOKEN_MINT_ADDRESS: Optional[str] = os.getenv("TOKEN_MINT_ADDRESS")
+    REWARD_AUTHORITY_KEYPAIR: Optional[str] = os.getenv("REWARD_AUTHORITY_KEYPAIR")  # keypair file path
+    TOKEN_DECIMALS: int = 9
+    TOKEN_AMOUNT_SCALE: int = field(init=False)  # whole tokens to base units, from TOKEN_DECIMALS
+    ATA_CACHE_TTL: int = int(os.getenv("ATA_CACHE_TTL", "3600"))  # seconds
 
     # AI Configuration
-    KNOWLEDGE_EXCHANGE_INTERVAL = 300  # seconds
-    VALIDATION_THRESHOLD = 0.85
-    MAX_LEARNING_PATHWAYS = 100
+    KNOWLEDGE_EXCHANGE_INTERVAL: int = 300  # seconds
+    VALIDATION_THRESHOLD: float = 0.85
+    MAX_LEARNING_PATHWAYS: int = 100
 
     # API Configuration
-    API_HOST = os.getenv("API_HOST", "0.0.0.0")
-    API_PORT = int(os.getenv("API_PORT", "8000"))
+    ENV: str = os.getenv("ENV", "development")
+    API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
+    API_PORT: int = int(os.getenv("API_PORT", "8000"))
+    # Pathways and caches live in process memory, so extra workers each see
+    # only their own share of the knowledge graph
+    API_WORKERS: int = int(os.getenv("API_WORKERS", "1"))
+    DEV_RELOAD: bool = os.getenv("DEV_RELOAD") == "1"
 
     # Security
-    SECRET_KEY = os.getenv("SECRET_KEY")
+    SECRET_KEY: Optional[str] = os.getenv("SECRET_KEY")
 
     # Database
-    DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///parentheses.db")
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///parentheses.db")
 
+    def __post_init__(self):
+        # Frozen, so the derived value is set through object.__setattr__
+        object.__setattr__(self, "TOKEN_AMOUNT_SCALE", 10 ** self.TOKEN_DECIMALS)
 
-settings = Settings()
\ No newline at end of file
+
+settings = Settings()
@@ -1,14 +1,26 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from logging.handlers import QueueHandler, QueueListener
+import asyncio
+import logging
+import queue
 from src.api.routes import router
 from src.api.handlers import setup_handlers
 from src.blockchain.solana_client import SolanaClient
 from src.ai.knowledge_exchange import KnowledgeExchange
 from src.config.settings import settings
 
+# Interactive docs and the OpenAPI schema are only served outside production
+docs_enabled = settings.ENV != "prod"
+
 app = FastAPI(
     title="Parentheses Protocol",
     description="A protocol for collaborative AI learning on Solana blockchain",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    docs_url="/docs" if docs_enabled else None,
+    redoc_url="/redoc" if docs_enabled else None,
+    openapi_url="/openapi.json" if docs_enabled else None
 )
 
 # Initialize Solana client
@@ -29,15 +41,47 @@ setup_handlers(app)
 # Include API routes
 app.include_router(router, prefix="/api/v1")
 
+log_listener = None
+
+def start_log_listener() -> QueueListener:
+    # Loggers only enqueue records; handler I/O runs on the listener thread
+    root = logging.getLogger()
+    handlers = root.handlers or [logging.lastResort]
+    log_queue = queue.SimpleQueue()
+    root.handlers = [QueueHandler(log_queue)]
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
 @app.on_event("startup")
 async def startup_event():
-    await solana_client.initialize()
-    await knowledge_exchange.start_exchange_cycle()
+    global log_listener
+    if log_listener is None:
+        log_listener = start_log_listener()
+
+    # The exchange cycle only touches the chain once pathways have content,
+    # so it can start while the RPC connection is still being set up
+    await asyncio.gather(
+        solana_client.initialize(),
+        knowledge_exchange.start_exchange_cycle()
+    )
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    await solana_client.cleanup()
+    global log_listener
+    # Stop the exchange cycle before closing the RPC client, so a reward
+    # send in flight never hits a closed session
     await knowledge_exchange.stop_exchange_cycle()
+    await solana_client.cleanup()
+
+    if log_listener is not None:
+        log_listener.stop()
+        logging.getLogger().handlers = [
+            handler for handler in log_listener.handlers
+            if handler is not logging.lastResort
+        ]
+        log_listener = None
 
 if __name__ == "__main__":
     import uvicorn
@@ -45,5 +89,9 @@ if __name__ == "__main__":
         "main:app",
         host=settings.API_HOST,
         port=settings.API_PORT,
-        reload=True
+        # The reloader's file watcher is for local development only
+        reload=settings.DEV_RELOAD,
+        workers=1 if settings.DEV_RELOAD else settings.API_WORKERS,
+        loop="uvloop",
+        http="httptools"
     )
\ No newline at end of file
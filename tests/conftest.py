@@ -6,17 +6,11 @@ from src.main import app
 
 @pytest.fixture(scope="session")
 def event_loop() -> Generator:
-    loop = asyncio.get_event_loop_policy().new_event_loop()
+    loop = asyncio.new_event_loop()
     yield loop
     loop.close()
 
-@pytest.fixture(scope="module")
+@pytest.fixture(scope="session")
 def test_app():
     client = TestClient(app)
     yield client
-
-@pytest.fixture(autouse=True)
-async def setup_teardown():
-    # Setup
-    yield
-    # Teardown
\ No newline at end of file
@@ -1,9 +1,11 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from datetime import datetime
+import numpy as np
 from src.ai.knowledge_exchange import KnowledgeExchange
 from src.ai.validation import KnowledgeValidator
 from src.ai.learning_pathway import LearningPathway
+from src.blockchain.keys import pk
 
 
 @pytest.fixture
@@ -22,7 +24,7 @@ def learning_pathway():
 
 
 @pytest.fixture
-async def knowledge_exchange(mock_solana_client):
+def knowledge_exchange(mock_solana_client):
     exchange = KnowledgeExchange(
         solana_client=mock_solana_client,
         validation_threshold=0.85
@@ -55,6 +57,42 @@ async def test_knowledge_submission(knowledge_exchange):
     assert result == "tx_id"
 
 
+@pytest.mark.asyncio
+async def test_knowledge_batch_partial_failure(knowledge_exchange):
+    knowledge_batch = [
+        {
+            "content": {
+                "type": "algorithm",
+                "algorithm": {
+                    "name": f"test_algo_{i}",
+                    "parameters": {"param1": 1},
+                    "complexity": "O(n)"
+                }
+            },
+            "domain": "test_domain",
+            "contributor": "test_user",
+            "metadata": {},
+            "dependencies": [],
+            "version": "1.0.0",
+            "timestamp": datetime.now().isoformat()
+        }
+        for i in range(2)
+    ]
+
+    knowledge_exchange.solana_client.submit_knowledge_transaction = AsyncMock(
+        side_effect=["tx_id", RuntimeError("RPC unavailable")]
+    )
+    knowledge_id = knowledge_exchange._compute_digest(knowledge_batch[0]).hex()
+
+    result = await knowledge_exchange.submit_knowledge_batch(knowledge_batch)
+
+    assert result == ["tx_id", None]
+    pathway = knowledge_exchange.learning_pathways["test_domain"]
+    assert list(pathway.knowledge_graph) == [knowledge_id]
+    assert "_digest" not in knowledge_batch[0]
+    assert "_ts_epoch" not in knowledge_batch[0]
+
+
 def test_knowledge_validation(knowledge_validator):
     valid_knowledge = {
         "content": {
@@ -76,6 +114,40 @@ def test_knowledge_validation(knowledge_validator):
     assert knowledge_validator._validate_structure(valid_knowledge) == True
 
 
+def test_digest_matches_validation_cache_key(knowledge_exchange, knowledge_validator):
+    knowledge_data = {"content": {"value": 2 ** 70}, "domain": "test_domain"}
+
+    digest = knowledge_exchange._compute_digest(knowledge_data)
+
+    assert digest == knowledge_validator._generate_cache_key(knowledge_data)
+
+
+@pytest.mark.asyncio
+async def test_validation_cache_eviction(knowledge_validator):
+    knowledge_validator.cache_max = 2
+
+    for i in range(3):
+        knowledge_data = {
+            "content": {
+                "type": "algorithm",
+                "algorithm": {
+                    "name": f"test_algo_{i}",
+                    "parameters": {"param1": 1},
+                    "complexity": "O(n)"
+                }
+            },
+            "domain": "test_domain",
+            "contributor": "test_user",
+            "metadata": {},
+            "dependencies": [],
+            "version": "1.0.0",
+            "timestamp": datetime.now().isoformat()
+        }
+        assert await knowledge_validator.validate_knowledge(knowledge_data, cache_key=bytes([i]))
+
+    assert list(knowledge_validator.validation_cache) == [bytes([1]), bytes([2])]
+
+
 @pytest.mark.asyncio
 async def test_learning_pathway_knowledge_addition(learning_pathway):
     knowledge_data = {
@@ -89,6 +161,23 @@ async def test_learning_pathway_knowledge_addition(learning_pathway):
     assert learning_pathway.contributor_scores["test_user"] == 1
 
 
+@pytest.mark.asyncio
+async def test_learning_pathway_batch_addition(learning_pathway):
+    batch = [
+        ("test_id1", {"content": "shared tokens one", "contributor": "user1"}),
+        ("test_id2", {"content": "shared tokens one", "contributor": "user1"}),
+        ("test_id3", {"content": "unrelated", "contributor": "user2"})
+    ]
+
+    await learning_pathway.add_knowledge_batch(batch)
+
+    assert len(learning_pathway.knowledge_graph) == 3
+    assert learning_pathway.connections["test_id1"] == ["test_id2"]
+    assert learning_pathway.connections["test_id2"] == ["test_id1"]
+    assert learning_pathway.connections["test_id3"] == []
+    assert learning_pathway.contributor_scores == {"user1": 2, "user2": 1}
+
+
 @pytest.mark.asyncio
 async def test_knowledge_query(learning_pathway):
     knowledge_data = {
@@ -107,6 +196,28 @@ async def test_knowledge_query(learning_pathway):
     assert results[0]["content"] == "test_content"
 
 
+@pytest.mark.asyncio
+async def test_knowledge_query_multiple_filters(learning_pathway):
+    for i, (contributor, version) in enumerate([
+        ("user1", "1.0.0"),
+        ("user1", "2.0.0"),
+        ("user2", "1.0.0")
+    ]):
+        await learning_pathway.add_knowledge(f"test_id{i}", {
+            "content": f"test_content{i}",
+            "domain": "test_domain",
+            "contributor": contributor,
+            "version": version
+        })
+
+    results = await learning_pathway.query_knowledge(
+        {"contributor": "user1", "version": "1.0.0"}
+    )
+
+    assert len(results) == 1
+    assert results[0]["content"] == "test_content0"
+
+
 @pytest.mark.asyncio
 async def test_performance_metrics_calculation(learning_pathway):
     knowledge_data = {
@@ -116,8 +227,9 @@ async def test_performance_metrics_calculation(learning_pathway):
         "usage_count": 10
     }
 
-    await learning_pathway._calculate_performance_metrics("test_id")
+    await learning_pathway.add_knowledge("test_id", knowledge_data)
     assert "test_id" in learning_pathway.performance_metrics
+    assert learning_pathway.performance_metrics["test_id"] == pytest.approx(0.4 + 0.6 * np.log1p(10))
 
 
 @pytest.mark.asyncio
@@ -158,4 +270,37 @@ async def test_top_contributors(learning_pathway):
     await learning_pathway.add_knowledge("test_id2", knowledge_data2)
 
     contributors = await learning_pathway.get_top_contributors()
-    assert len(contributors) == 2
\ No newline at end of file
+    assert len(contributors) == 2
+
+
+@pytest.mark.asyncio
+async def test_reward_distribution_skips_invalid_contributors(knowledge_exchange, learning_pathway):
+    contributor = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+    learning_pathway.contributor_scores.update({contributor: 2, "alice": 1})
+
+    token_manager = knowledge_exchange.solana_client.token_manager
+    token_manager.amount_scale = 10
+    token_manager.distribute_rewards_batch = AsyncMock(return_value=["tx_id"])
+    knowledge_exchange.solana_client.verify_transactions = AsyncMock(return_value=[True])
+
+    await knowledge_exchange._distribute_rewards(learning_pathway)
+
+    token_manager.distribute_rewards_batch.assert_called_once_with([(pk(contributor), 20)])
+
+
+@pytest.mark.asyncio
+async def test_centrality_calculation(learning_pathway):
+    tokens = [f"t{i}" for i in range(20)]
+    # "a" shares enough tokens with both "b" and "c"; they are not related
+    await learning_pathway.add_knowledge_batch([
+        ("a", {"content": " ".join(tokens)}),
+        ("b", {"content": " ".join(tokens[:16])}),
+        ("c", {"content": " ".join(tokens[4:])})
+    ])
+    assert learning_pathway.connections == {"a": ["b", "c"], "b": ["a"], "c": ["a"]}
+
+    a, b, c = learning_pathway._calculate_centrality()
+
+    assert abs(a + b + c - 1) < 1e-6
+    assert a > b
+    assert abs(b - c) < 1e-6
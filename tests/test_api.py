@@ -1,22 +1,67 @@
 import pytest
-from fastapi.testclient import TestClient
+import time
+import jwt
 from datetime import datetime
-from unittest.mock import Mock, patch
-from src.main import app
+from unittest.mock import AsyncMock, Mock, patch
+from cachetools import TTLCache
+from fastapi import HTTPException
+from src.api import handlers
 from src.api.routes import router, KnowledgeSubmission, QueryParams
 
+TEST_SIGNING_KEY = b"test-signing-key-of-at-least-32-bytes"
+
+
+@pytest.fixture(autouse=True)
+def api_state(test_app):
+    # The TestClient is shared, so each test starts with fresh rate limits
+    # and token cache, and tokens are signed with a known key
+    test_app.app.state.rate_limits.clear()
+    handlers.TOKEN_CACHE.clear()
+    with patch.object(handlers, "SIGNING_KEY", TEST_SIGNING_KEY):
+        yield
+
+
+def make_token(exp_offset: int = 300) -> str:
+    return jwt.encode(
+        {"sub": "test_user", "exp": int(time.time()) + exp_offset},
+        TEST_SIGNING_KEY,
+        algorithm="HS256"
+    )
+
 
 @pytest.fixture
-def test_client():
-    return TestClient(app)
+def auth_headers():
+    return {"Authorization": f"Bearer {make_token()}"}
 
 
 @pytest.fixture
 def mock_knowledge_exchange():
-    return Mock()
+    exchange = Mock()
+    exchange.submit_knowledge = AsyncMock()
+    exchange.submit_knowledge_batch = AsyncMock()
+    exchange.query_knowledge = AsyncMock()
+    return exchange
+
+
+def submission(name: str = "test_algo") -> dict:
+    return {
+        "content": {
+            "type": "algorithm",
+            "algorithm": {
+                "name": name,
+                "parameters": {"param1": 1},
+                "complexity": "O(n)"
+            }
+        },
+        "domain": "test_domain",
+        "contributor": "test_user",
+        "metadata": {},
+        "dependencies": [],
+        "version": "1.0.0"
+    }
 
 
-def test_knowledge_submission(test_client, mock_knowledge_exchange):
+def test_knowledge_submission(test_app, mock_knowledge_exchange, auth_headers):
     router.knowledge_exchange = mock_knowledge_exchange
     mock_knowledge_exchange.submit_knowledge.return_value = "tx_id"
 
@@ -36,14 +81,14 @@ def test_knowledge_submission(test_client, mock_knowledge_exchange):
         "version": "1.0.0"
     }
 
-    response = test_client.post("/api/v1/knowledge/submit", json=submission_data)
+    response = test_app.post("/api/v1/knowledge/submit", json=submission_data, headers=auth_headers)
 
     assert response.status_code == 200
     assert response.json()["transaction_id"] == "tx_id"
     mock_knowledge_exchange.submit_knowledge.assert_called_once()
 
 
-def test_knowledge_query(test_client, mock_knowledge_exchange):
+def test_knowledge_query(test_app, mock_knowledge_exchange, auth_headers):
     router.knowledge_exchange = mock_knowledge_exchange
     mock_knowledge_exchange.query_knowledge.return_value = [
         {
@@ -58,22 +103,22 @@ def test_knowledge_query(test_client, mock_knowledge_exchange):
         "limit": 10
     }
 
-    response = test_client.post("/api/v1/knowledge/query", json=query_data)
+    response = test_app.post("/api/v1/knowledge/query", json=query_data, headers=auth_headers)
 
     assert response.status_code == 200
     assert len(response.json()["results"]) == 1
     mock_knowledge_exchange.query_knowledge.assert_called_once()
 
 
-def test_domain_stats(test_client, mock_knowledge_exchange):
+def test_domain_stats(test_app, mock_knowledge_exchange, auth_headers):
     router.knowledge_exchange = mock_knowledge_exchange
 
     mock_pathway = Mock()
     mock_pathway.knowledge_graph = {"id1": {}, "id2": {}}
-    mock_pathway.get_top_contributors.return_value = [
+    mock_pathway.get_top_contributors = AsyncMock(return_value=[
         ("user1", 10),
         ("user2", 5)
-    ]
+    ])
     mock_pathway.performance_metrics = {
         "id1": 0.8,
         "id2": 0.6
@@ -83,14 +128,14 @@ def test_domain_stats(test_client, mock_knowledge_exchange):
         "test_domain": mock_pathway
     }
 
-    response = test_client.get("/api/v1/stats/test_domain")
+    response = test_app.get("/api/v1/stats/test_domain", headers=auth_headers)
 
     assert response.status_code == 200
     assert response.json()["total_knowledge"] == 2
     assert len(response.json()["top_contributors"]) == 2
 
 
-def test_invalid_knowledge_submission(test_client, mock_knowledge_exchange):
+def test_invalid_knowledge_submission(test_app, mock_knowledge_exchange, auth_headers):
     router.knowledge_exchange = mock_knowledge_exchange
     mock_knowledge_exchange.submit_knowledge.side_effect = ValueError("Invalid knowledge")
 
@@ -103,37 +148,147 @@ def test_invalid_knowledge_submission(test_client, mock_knowledge_exchange):
         "version": "1.0.0"
     }
 
-    response = test_client.post("/api/v1/knowledge/submit", json=submission_data)
+    response = test_app.post("/api/v1/knowledge/submit", json=submission_data, headers=auth_headers)
 
     assert response.status_code == 400
     assert "Invalid knowledge" in response.json()["detail"]
 
 
-def test_domain_not_found(test_client, mock_knowledge_exchange):
+def test_domain_not_found(test_app, mock_knowledge_exchange, auth_headers):
     router.knowledge_exchange = mock_knowledge_exchange
     mock_knowledge_exchange.learning_pathways = {}
 
-    response = test_client.get("/api/v1/stats/nonexistent_domain")
+    response = test_app.get("/api/v1/stats/nonexistent_domain", headers=auth_headers)
 
     assert response.status_code == 404
     assert "Domain not found" in response.json()["detail"]
 
 
 @pytest.mark.asyncio
-async def test_rate_limiting(test_client):
+async def test_rate_limiting(test_app, mock_knowledge_exchange, auth_headers):
+    router.knowledge_exchange = mock_knowledge_exchange
+    mock_knowledge_exchange.learning_pathways = {}
+
     for _ in range(101):  # Exceed rate limit (100 requests per minute)
-        response = test_client.get("/api/v1/stats/test_domain")
+        response = test_app.get("/api/v1/stats/test_domain", headers=auth_headers)
 
     assert response.status_code == 429
     assert "Rate limit exceeded" in response.json()["error"]
 
 
-def test_authentication(test_client):
-    response = test_client.post(
+def test_authentication(test_app):
+    response = test_app.post(
         "/api/v1/knowledge/submit",
         json={},
-        headers={"Authorization": "Invalid"}
+        headers={"Authorization": "Bearer invalid"}
+    )
+
+    assert response.status_code == 401
+    assert "Invalid authentication token" in response.json()["error"]
+
+
+def test_missing_authentication(test_app):
+    response = test_app.get("/api/v1/stats/test_domain")
+
+    assert response.status_code == 401
+    assert response.json()["error"] == "Missing or invalid authentication token"
+    assert response.headers["Access-Control-Allow-Origin"] == "*"
+
+
+def test_expired_token(test_app):
+    response = test_app.get(
+        "/api/v1/stats/test_domain",
+        headers={"Authorization": f"Bearer {make_token(exp_offset=-60)}"}
     )
 
     assert response.status_code == 401
-    assert "Invalid authentication token" in response.json()["error"]
\ No newline at end of file
+    assert response.json()["error"] == "Invalid authentication token"
+
+
+def test_public_path_skips_authentication(test_app):
+    response = test_app.get("/api/v1/public/status")
+
+    # No public routes exist yet; reaching the router means auth was skipped
+    assert response.status_code == 404
+    assert "X-Request-ID" in response.headers
+
+
+def test_authenticated_request_context(test_app, mock_knowledge_exchange, auth_headers):
+    router.knowledge_exchange = mock_knowledge_exchange
+    mock_knowledge_exchange.learning_pathways = {}
+
+    first = test_app.get("/api/v1/stats/test_domain", headers=auth_headers)
+    second = test_app.get("/api/v1/stats/test_domain", headers=auth_headers)
+
+    assert first.status_code == 404
+    assert first.headers["Access-Control-Allow-Origin"] == "*"
+    assert first.headers["X-Response-Time"].endswith("s")
+    assert first.headers["X-Request-ID"] < second.headers["X-Request-ID"]
+    assert test_app.app.state.rate_limits["testclient"]["tokens"] < handlers.RATE_LIMIT_REQUESTS - 1
+
+
+def test_token_cache(test_app, mock_knowledge_exchange, auth_headers):
+    router.knowledge_exchange = mock_knowledge_exchange
+    mock_knowledge_exchange.learning_pathways = {}
+
+    with patch.object(handlers.jwt, "decode", wraps=jwt.decode) as decode:
+        for _ in range(3):
+            test_app.get("/api/v1/stats/test_domain", headers=auth_headers)
+
+    decode.assert_called_once()
+
+
+def test_token_bucket_refill():
+    rate_limits = TTLCache(maxsize=16, ttl=300)
+
+    with patch.object(handlers.time, "monotonic", return_value=1000.0) as monotonic:
+        for _ in range(handlers.RATE_LIMIT_REQUESTS):
+            handlers.check_rate_limit(rate_limits, "client")
+
+        # 1.5s at 100 requests per minute refills two and a half tokens
+        monotonic.return_value += 1.5
+        handlers.check_rate_limit(rate_limits, "client")
+        handlers.check_rate_limit(rate_limits, "client")
+
+        with pytest.raises(HTTPException) as exc_info:
+            handlers.check_rate_limit(rate_limits, "client")
+        assert exc_info.value.status_code == 429
+
+        # Once limited, the client stays blocked for the whole window
+        monotonic.return_value += handlers.RATE_LIMIT_WINDOW / 2
+        with pytest.raises(HTTPException) as exc_info:
+            handlers.check_rate_limit(rate_limits, "client")
+        assert exc_info.value.detail == "Too many requests. Please try again later."
+
+
+def test_malformed_submission_body(test_app, mock_knowledge_exchange, auth_headers):
+    router.knowledge_exchange = mock_knowledge_exchange
+
+    response = test_app.post(
+        "/api/v1/knowledge/submit",
+        json={"domain": "test_domain"},
+        headers=auth_headers
+    )
+
+    assert response.status_code == 422
+    mock_knowledge_exchange.submit_knowledge.assert_not_called()
+
+
+def test_knowledge_batch_submission(test_app, mock_knowledge_exchange, auth_headers):
+    router.knowledge_exchange = mock_knowledge_exchange
+    mock_knowledge_exchange.submit_knowledge_batch.return_value = ["tx_id1", None]
+
+    response = test_app.post(
+        "/api/v1/knowledge/submit/batch",
+        json=[submission("test_algo1"), submission("test_algo2")],
+        headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["transaction_ids"] == ["tx_id1", None]
+
+    knowledge_batch = mock_knowledge_exchange.submit_knowledge_batch.call_args.args[0]
+    assert [knowledge["content"]["algorithm"]["name"] for knowledge in knowledge_batch] == [
+        "test_algo1", "test_algo2"
+    ]
+    assert knowledge_batch[0]["timestamp"] == knowledge_batch[1]["timestamp"]
@@ -1,21 +1,26 @@
 import pytest
-from unittest.mock import Mock, patch
-from solders.pubkey import Pubkey
+import orjson
+from unittest.mock import AsyncMock, Mock, patch
+from solana.keypair import Keypair
+from solana.rpc.core import RPCException
+from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus, TransactionErrorFieldless
+from src.blockchain.keys import pk
 from src.blockchain.solana_client import SolanaClient
 from src.blockchain.token_manager import TokenManager
 
 
 @pytest.fixture
-async def mock_solana_client():
+def mock_solana_client():
     client = SolanaClient("https://api.mainnet-beta.solana.com", "mainnet-beta")
     client.client = Mock()
     return client
 
 
 @pytest.fixture
-async def mock_token_manager(mock_solana_client):
-    token_mint = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
-    return TokenManager(mock_solana_client.client, token_mint)
+def mock_token_manager(mock_solana_client):
+    token_mint = pk("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+    return TokenManager(mock_solana_client.client, token_mint, Keypair())
 
 
 @pytest.mark.asyncio
@@ -33,7 +38,7 @@ async def test_token_supply_fetch(mock_solana_client):
         "result": {"value": {"amount": "1000000"}}
     }
 
-    token_mint = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+    token_mint = pk("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
     supply = await mock_solana_client.get_token_supply(token_mint)
 
     assert supply == "1000000"
@@ -42,14 +47,84 @@ async def test_token_supply_fetch(mock_solana_client):
 
 @pytest.mark.asyncio
 async def test_token_account_creation(mock_token_manager):
-    owner = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
-    mock_token_manager.client.get_account_info.return_value = {"result": {"value": None}}
+    owner = pk("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+    mock_token_manager.client.get_multiple_accounts = AsyncMock(
+        return_value=Mock(value=[None])
+    )
+    mock_token_manager.client.get_latest_blockhash = AsyncMock(
+        return_value=Mock(value=Mock(blockhash="test_blockhash"))
+    )
+    mock_token_manager.client.send_transaction = AsyncMock()
 
     await mock_token_manager.create_token_account(owner)
 
     mock_token_manager.client.send_transaction.assert_called_once()
 
 
+@pytest.mark.asyncio
+async def test_token_account_creation_batches(mock_token_manager):
+    owners = [Keypair().public_key for _ in range(30)]
+    mock_token_manager.client.get_multiple_accounts = AsyncMock(
+        return_value=Mock(value=[None] * 30)
+    )
+    mock_token_manager.client.get_latest_blockhash = AsyncMock(
+        return_value=Mock(value=Mock(blockhash="test_blockhash"))
+    )
+    mock_token_manager.client.send_transaction = AsyncMock()
+
+    token_accounts = await mock_token_manager.create_token_accounts(owners)
+
+    assert len(token_accounts) == 30
+    assert mock_token_manager.client.send_transaction.call_count == 3
+    mock_token_manager.client.get_latest_blockhash.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_blockhash_refresh_on_not_found(mock_token_manager):
+    owner = pk("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+    mock_token_manager.client.get_multiple_accounts = AsyncMock(
+        return_value=Mock(value=[None])
+    )
+    mock_token_manager.client.get_latest_blockhash = AsyncMock(
+        return_value=Mock(value=Mock(blockhash="test_blockhash"))
+    )
+    mock_token_manager.client.send_transaction = AsyncMock(side_effect=[
+        RPCException(Mock(data=Mock(err=TransactionErrorFieldless.BlockhashNotFound))),
+        Mock()
+    ])
+
+    await mock_token_manager.create_token_account(owner)
+
+    assert mock_token_manager.client.get_latest_blockhash.call_count == 2
+    assert mock_token_manager.client.send_transaction.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_reward_distribution_partial_failure(mock_token_manager):
+    recipients = [Keypair().public_key for _ in range(30)]
+    mock_token_manager.client.get_multiple_accounts = AsyncMock(
+        return_value=Mock(value=[None] * 30)
+    )
+    mock_token_manager.client.get_latest_blockhash = AsyncMock(
+        return_value=Mock(value=Mock(blockhash="test_blockhash"))
+    )
+    mock_token_manager.client.send_transaction = AsyncMock(side_effect=[
+        Mock(value="signature1"),
+        RPCException("Transaction simulation failed"),
+        Mock(value="signature3")
+    ])
+
+    signatures = await mock_token_manager.distribute_rewards_batch(
+        [(recipient, 10) for recipient in recipients]
+    )
+
+    assert mock_token_manager.client.send_transaction.call_count == 3
+    assert len(signatures) == 30
+    assert signatures[0] == "signature1"
+    assert signatures[-1] == "signature3"
+    assert None in signatures
+
+
 @pytest.mark.asyncio
 async def test_knowledge_transaction_submission(mock_solana_client):
     mock_solana_client._initialized = True
@@ -83,14 +158,61 @@ async def test_transaction_verification(mock_solana_client):
     mock_solana_client.client.confirm_transaction.assert_called_once_with("test_signature")
 
 
+@pytest.mark.asyncio
+async def test_batch_transaction_verification(mock_solana_client):
+    mock_solana_client.client.get_signature_statuses = AsyncMock(return_value=Mock(value=[
+        Mock(err=None, confirmation_status=TransactionConfirmationStatus.Finalized),
+        Mock(err="InstructionError", confirmation_status=TransactionConfirmationStatus.Confirmed)
+    ]))
+
+    signatures = [Signature.new_unique(), Signature.new_unique()]
+
+    result = await mock_solana_client.verify_transactions([str(signature) for signature in signatures])
+
+    assert result == [True, False]
+    mock_solana_client.client.get_signature_statuses.assert_called_once_with(signatures)
+
+
+@pytest.mark.asyncio
+async def test_batch_transaction_verification_invalid_signature(mock_solana_client):
+    mock_solana_client.client.get_signature_statuses = AsyncMock(return_value=Mock(value=[
+        Mock(err=None, confirmation_status=TransactionConfirmationStatus.Finalized)
+    ]))
+
+    signature = Signature.new_unique()
+
+    result = await mock_solana_client.verify_transactions(["not_a_signature", str(signature)])
+
+    assert result == [False, True]
+    mock_solana_client.client.get_signature_statuses.assert_called_once_with([signature])
+
+
 @pytest.mark.asyncio
 async def test_token_balance_fetch(mock_token_manager):
-    token_account = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
-    mock_token_manager.client.get_token_account_balance.return_value = {
-        "result": {"value": {"amount": "500"}}
-    }
+    token_account = pk("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+    mock_token_manager.client._provider.make_request_unparsed = AsyncMock(return_value=orjson.dumps({
+        "result": {"value": [
+            {"data": {"parsed": {"info": {"tokenAmount": {"amount": "500"}}}}}
+        ]}
+    }).decode())
 
     balance = await mock_token_manager.get_token_balance(token_account)
 
-    assert balance == "500"
-    mock_token_manager.client.get_token_account_balance.assert_called_once_with(token_account)
\ No newline at end of file
+    assert balance == 500
+    mock_token_manager.client._get_multiple_accounts_body.assert_called_once_with(
+        pubkeys=[token_account],
+        commitment=None,
+        encoding="jsonParsed",
+        data_slice=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_token_balance_fetch_rpc_error(mock_token_manager):
+    token_account = pk("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+    mock_token_manager.client._provider.make_request_unparsed = AsyncMock(return_value=orjson.dumps({
+        "error": {"code": -32005, "message": "Node is behind"}
+    }).decode())
+
+    with pytest.raises(RPCException, match="Node is behind"):
+        await mock_token_manager.get_token_balance(token_account)